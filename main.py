@@ -1,5 +1,497 @@
-def main():
-    print("Hello from css!")
+import argparse
+import json
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+
+from toolbox import extract
+from toolbox.extract import cells, locate
+from toolbox import analysis, audit, bench, contrast, cost, depgraph, fold, gamut, presets, ramp, layers, lint, rules, unlayered
+from toolbox.assets import publish
+from toolbox.build import MATRIX, build
+from toolbox.incremental import rebuild
+from toolbox.critical import blocks_render, critical, inline, linked_stylesheets
+from toolbox.minify import minify
+from toolbox.parse import Decl, Rule, parse, serialize
+from toolbox.purge import purge_css
+from toolbox.split import chunk_path, link_tags, merge_order, order_statement, split
+from toolbox.usage import scan
+from toolbox.watch import watch
+
+
+def read_css(source):
+    """CSS of a notebook (extracted) or of a stylesheet."""
+    source = Path(source)
+    return extract(source) if source.suffix == ".py" else source.read_text(encoding="utf-8")
+
+
+def source_lines(source):
+    """Bundle line -> notebook line for a notebook ``source``; identity for a stylesheet."""
+    source = Path(source)
+    if source.suffix != ".py":
+        return lambda line: line
+    cell_list = cells(source.read_text(encoding="utf-8"))
+    return lambda line: found[1] if (found := locate(cell_list, line)) else line
+
+
+def write(css, output):
+    if output:
+        Path(output).write_text(css, encoding="utf-8")
+    else:
+        sys.stdout.write(css)
+
+
+def cmd_extract(args):
+    if args.output and not args.no_cache:
+        stage, transform = ("minify", minify) if args.minify else ("extract", None)
+        print(rebuild(args.notebook, args.output, stage=stage, transform=transform), file=sys.stderr)
+        return
+    css = extract(args.notebook)
+    write(minify(css) if args.minify else css, args.output)
+
+
+def cmd_build(args):
+    targets = [t for t in MATRIX if not args.targets or t.output in args.targets]
+    if args.list:
+        for t in targets:
+            print(f"{t.output:40} <- {t.source}")
+        return
+    for r in build(targets, jobs=args.jobs):
+        state = "written" if r.written else "unchanged"
+        print(f"{r.output:40} {r.size:>8} B  {r.seconds * 1000:6.1f} ms  {state}")
+    if args.dist:
+        css = {t.name: Path(t.output).read_bytes() for t in targets
+               if t.output.endswith(".css") and t.name != t.output}
+        for name, entry in publish(css, args.dist, jobs=args.jobs).items():
+            sizes = "  ".join(f"{k} {entry[k]['size']:>6}" for k in ("br", "gz", "zst") if k in entry)
+            print(f"{entry['file']:40} {entry['size']:>8} B  {sizes}")
+
+
+def cmd_purge(args):
+    usage = scan(args.templates)
+    usage.classes.update(args.safelist)
+    nodes = purge_css(read_css(args.input), usage)
+    write(minify(serialize(nodes)) if args.minify else serialize(nodes), args.output)
+
+
+def cmd_fold(args):
+    if not args.templates and not args.all:
+        sys.exit("fold: pass the templates to fold for, or --all to emit every combination "
+                 "(about 3.4x the bundle)")
+    usage = None if args.all else scan(args.templates)
+    css = read_css(args.input)
+    folded = serialize(fold.fold(css, usage))
+    print(f"{len(css.encode())} -> {len(folded.encode())} bytes", file=sys.stderr)
+    write(minify(folded) if args.minify else folded, args.output)
+
+
+def cmd_critical(args):
+    page = Path(args.page)
+    html = page.read_text(encoding="utf-8")
+    if args.input:
+        css = read_css(args.input)
+    else:
+        # Sheets for other media keep their links and load as before; none of it paints first.
+        css = "\n".join(p.read_text(encoding="utf-8") for p, media in linked_stylesheets(html, page.parent)
+                        if blocks_render(media))
+    write(inline(html, minify(serialize(critical(css, html)))), args.output)
+
+
+def cmd_split(args):
+    css = read_css(args.input)
+    order = order_statement(args.order) if args.order else None
+    if order is not None:
+        added = merge_order(order, list(parse(css)))[1]
+        if added:
+            print(f"{args.order}: order statement misses {', '.join(added)}; "
+                  "added at their bundle position", file=sys.stderr)
+    chunks = split(css, order)
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    for name, nodes in chunks.items():
+        css = serialize(nodes)
+        chunk_path(args.output, name).write_text(minify(css) if args.minify else css, encoding="utf-8")
+    html = Path(args.page).read_text(encoding="utf-8") if args.page else None
+    print(link_tags(Path(args.output).name, list(chunks), html))
+
+
+def cmd_lint(args):
+    source = Path(args.source)
+    css = read_css(source)
+    codes = () if args.no_rules else args.rule
+    if args.no_cache:
+        idx = lint.index(css)
+        found = rules.check(parse(css), idx, codes, args.domain_noun) if codes != () else []
+        issues = sorted(lint.lint(idx) + found, key=lambda i: (lint.SEVERITIES.index(i.severity), i.line))
+    else:
+        stats = analysis.Stats()
+        idx, issues = analysis.lint(css, codes, args.domain_noun, stats=stats)
+        print(f"{source}: {stats}", file=sys.stderr)
+    line = source_lines(source)
+    issues = [lint.Issue(i.severity, i.code, i.message, line(i.line)) for i in issues]
+    if args.json:
+        print(json.dumps(lint.as_json(idx, issues), indent=2))
+    else:
+        print(lint.report(idx, issues))
+    if any(i.severity == lint.ERROR for i in issues):
+        sys.exit(1)
+
+
+def cmd_unlayered(args):
+    findings = unlayered.find(args.notebook)
+    if args.sarif:
+        write(json.dumps(unlayered.sarif(args.notebook, findings), indent=2) + "\n",
+              None if args.sarif == "-" else args.sarif)
+    if args.fix:
+        path = Path(args.notebook)
+        path.write_text(unlayered.fix(path.read_text(encoding="utf-8"), findings), encoding="utf-8")
+        findings = [f for f in findings if f.layer is None]
+    if findings and args.sarif != "-":
+        print(unlayered.report(args.notebook, findings), file=sys.stderr)
+    if findings:
+        sys.exit(1)
+
+
+def cmd_layers(args):
+    sheet_list = []
+    for source in map(Path, args.sources):
+        if source.suffix in (".html", ".htm"):
+            html = source.read_text(encoding="utf-8")
+            for missing in (p for p, _ in linked_stylesheets(html, source.parent) if not p.is_file()):
+                print(f"{source}: {missing} not found, skipped", file=sys.stderr)
+            sheet_list += layers.sheets(html, source.parent, source.as_posix())
+        else:
+            sheet_list.append(layers.Sheet(source.as_posix(), read_css(source)))
+    cascade = layers.resolve(sheet_list)
+    print(layers.report(cascade, args.rules))
+    if any(i.severity == lint.ERROR for _, i in cascade.issues):
+        sys.exit(1)
+
+
+def cmd_audit(args):
+    paths = audit.sources(args.root, args.patterns or audit.SOURCES)
+    results = []
+    start = time.perf_counter()
+    for r in audit.audit(paths, jobs=args.jobs):
+        print(audit.progress(r), file=sys.stderr)
+        results.append(r)
+    print(f"{len(results)} files in {(time.perf_counter() - start) * 1000:.0f} ms", file=sys.stderr)
+    results.sort(key=lambda r: r.path)
+    print(json.dumps(audit.as_json(results), indent=2) if args.json else audit.report(results))
+    if any(r.error or any(i.severity == lint.ERROR for i in r.issues) for r in results):
+        sys.exit(1)
+
+
+def custom_property(name: str) -> str:
+    # argparse takes "--_bg" for an option, so the dashes may be left off.
+    return name if name.startswith("--") else f"--{name}"
+
+
+def cmd_deps(args):
+    graph = depgraph.load(read_css(args.source))
+    if args.token:
+        depths = graph.depths()
+        users = graph.dependents().get(args.token, [])
+        print(f"{args.token}: depth {depths.get(args.token, (0, None))[0]}")
+        print(f"  chain:   {' → '.join(reversed(graph.chain(args.token, depths)))}")
+        print(f"  reads:   {', '.join(graph.deps.get(args.token, [])) or 'nothing'}")
+        print(f"  read by: {', '.join(users) or 'nothing'}")
+    elif args.json:
+        print(json.dumps(graph.to_json(), indent=2))
+    else:
+        print(depgraph.report(graph, args.top))
+
+
+def cmd_contrast(args):
+    configs = [] if args.no_themes else contrast.themes(read_css(args.source))
+    base = configs[0][1] if configs else contrast.Config()
+    for path in args.configs:
+        configs += contrast.load_configs(path, base)
+    grid = contrast.Grid(bg_steps=args.bg_steps, hue_step=args.hue_step)
+    reports = []
+    start = time.perf_counter()
+    for report in contrast.sweep_all(configs, grid, jobs=args.jobs):
+        reports.append(report)
+        if not args.json:
+            print(contrast.table(report, args.pair or (*contrast.PAIRS, "flip")))
+    print(f"{len(reports)} configs, {sum(r.cached for r in reports)} from cache, "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms", file=sys.stderr)
+    if args.json:
+        print(json.dumps([r.to_json() for r in reports], indent=2))
+
+
+def cmd_gamut(args):
+    css = read_css(args.source)
+    configs = [] if args.no_themes else contrast.themes(css)
+    for path in args.configs:
+        configs += contrast.load_configs(path, configs[0][1] if configs else contrast.Config())
+    grid = gamut.Grid(bg_steps=args.bg_steps, hue_step=args.hue_step)
+    tables = {}
+    for name, cfg in configs:
+        print(gamut.report(name, cfg, gamut.coverage(cfg, grid)))
+        if args.output:
+            tables[name] = {g: gamut.chroma_lut(cfg, grid, g) for g in gamut.GAMUTS}
+    if args.output:
+        gamut.write_lut(args.output, tables, grid)
+    if args.css and configs:
+        preset_hues = {v.selector: v.hue for v in fold.inputs(list(parse(css))).presets}
+        Path(args.css).write_text(serialize(gamut.fallback_css(configs[0][1], preset_hues)), encoding="utf-8")
+
+
+def cmd_presets(args):
+    compiled = presets.compile_all(presets.load(args.data), jobs=args.jobs)
+    page = Path(args.page)
+    html = page.read_text(encoding="utf-8")
+    rendered = presets.render_page(html, compiled)
+    if rendered != html:
+        page.write_text(rendered, encoding="utf-8")
+    print(f"{len(compiled)} presets -> {page}{'' if rendered != html else ' (unchanged)'}", file=sys.stderr)
+    if args.css:
+        Path(args.css).write_text(serialize(presets.theme_css(compiled)), encoding="utf-8")
+    if args.swatches:
+        Path(args.swatches).write_text(json.dumps(presets.swatch_json(compiled), indent=2) + "\n",
+                                       encoding="utf-8")
+
+
+def cmd_ramp(args):
+    if len(args.step) not in (1, 4):
+        sys.exit("ramp: --step takes one step or four (depth 0→1, 1→2, 2→3, 3→4)")
+    top = np.array(args.top_l, dtype=float)[:, None]
+    hue = np.array(args.hue or [np.nan], dtype=float)[None, :]
+    try:
+        solutions = ramp.solve(top, args.step if len(args.step) == 4 else args.step[0], metric=args.metric,
+                               hue=hue, curve_k=args.curve_k)
+    except ValueError as e:
+        sys.exit(f"ramp: {e}")
+    max_error = args.max_error / 100
+    failed = [s for s in solutions if s.problems(max_error)]
+    if args.css:
+        # Blocks that miss the target are left out rather than shipped as if they were the ramp.
+        out = [Rule(args.selector.format(top_l=f"{s.config.top_l:g}", hue=f"{s.hue:g}"),
+                    [Decl(k, v) for k, v in s.css().items()]) for s in solutions if not s.problems(max_error)]
+        print(serialize(out), end="")
+        for s in failed:
+            hue = "" if np.isnan(s.hue) else f" hue {s.hue:g}"
+            print(f"ramp: top-l {s.config.top_l:g}{hue}: {', '.join(s.problems(max_error))}, left out",
+                  file=sys.stderr)
+    else:
+        print(ramp.table(solutions, args.metric, max_error))
+    if failed:
+        sys.exit(1)
+
+
+def cmd_cost(args):
+    line = source_lines(args.source)
+    costs = [replace(c, line=line(c.line)) for c in cost.rank(parse(read_css(args.source)))]
+    if args.output:
+        write(json.dumps(cost.as_json(costs), indent=2) + "\n", args.output)
+    print(json.dumps(cost.as_json(costs[:args.top]), indent=2) if args.json else cost.report(costs, args.top))
+    if args.baseline:
+        worse = cost.compare(costs, json.loads(Path(args.baseline).read_text()), args.threshold)
+        for entry in worse:
+            print(entry, file=sys.stderr)
+        if worse:
+            sys.exit(1)
+
+
+def cmd_bench(args):
+    data = bench.run(tuple(args.scales), repeat=args.repeat, stages=args.stages)
+    print(bench.report(data))
+    if args.output:
+        write(json.dumps(data, indent=2) + "\n", args.output)
+    if args.baseline:
+        slower = bench.compare(data, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for line in slower:
+            print(f"slower: {line}", file=sys.stderr)
+        if slower:
+            sys.exit(1)
+
+
+def cmd_watch(args):
+    try:
+        watch(args.notebook, args.output, args.directory, args.host, args.port)
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="css", description="Toolbox CSS build tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("extract", help="write the css fences of a notebook as one bundle")
+    p.add_argument("notebook", nargs="?", default="notebooks/style.py")
+    p.add_argument("-o", "--output", help="output file (default: stdout)")
+    p.add_argument("--minify", action="store_true", help="minify the bundle")
+    p.add_argument("--no-cache", action="store_true",
+                   help="re-extract every cell instead of reusing cached fragments")
+    p.set_defaults(func=cmd_extract)
+
+    p = sub.add_parser("build", help="build every target in the build matrix")
+    p.add_argument("targets", nargs="*", help="outputs to build (default: all)")
+    p.add_argument("-j", "--jobs", type=int, help="worker processes (default: one per cpu)")
+    p.add_argument("--list", action="store_true", help="list targets and exit")
+    p.add_argument("--dist", metavar="DIR",
+                   help="also write content-hashed, precompressed copies and manifest.json to DIR")
+    p.set_defaults(func=cmd_build)
+
+    p = sub.add_parser("purge", help="drop layout/component/utility rules no template uses")
+    p.add_argument("templates", nargs="+", help="HTML files or template directories to scan")
+    p.add_argument("-i", "--input", default="notebooks/style.py", help="notebook or stylesheet")
+    p.add_argument("-o", "--output", help="output file (default: stdout)")
+    p.add_argument("--safelist", nargs="*", default=[], metavar="CLASS",
+                   help="classes to keep even if no template uses them")
+    p.add_argument("--minify", action="store_true")
+    p.set_defaults(func=cmd_purge)
+
+    p = sub.add_parser("fold", help="precompute core.color for pages that never set --bg at runtime")
+    p.add_argument("templates", nargs="*", help="HTML files or template directories; only fold the "
+                   "themes, presets and states they use")
+    p.add_argument("--all", action="store_true", help="fold every combination, without templates")
+    p.add_argument("-i", "--input", default="notebooks/style.py", help="notebook or stylesheet")
+    p.add_argument("-o", "--output", help="output file (default: stdout)")
+    p.add_argument("--minify", action="store_true")
+    p.set_defaults(func=cmd_fold)
+
+    p = sub.add_parser("critical", help="inline a page's critical css and defer its stylesheets")
+    p.add_argument("page", help="HTML page")
+    p.add_argument("-i", "--input", help="notebook or stylesheet (default: the page's linked stylesheets)")
+    p.add_argument("-o", "--output", help="output file (default: stdout)")
+    p.set_defaults(func=cmd_critical)
+
+    p = sub.add_parser("split", help="split a bundle into render-blocking, print and highlight chunks")
+    p.add_argument("-i", "--input", default="notebooks/style.py", help="notebook or stylesheet")
+    p.add_argument("-o", "--output", required=True,
+                   help="main chunk path; others are written next to it as <stem>.<chunk>.css")
+    p.add_argument("--order", help="stylesheet whose @layer statement opens every chunk")
+    p.add_argument("--page", help="only link the highlight chunk if this page has a <pre>")
+    p.add_argument("--minify", action="store_true")
+    p.set_defaults(func=cmd_split)
+
+    p = sub.add_parser("lint", help="check layers, @property registrations and custom properties")
+    p.add_argument("source", nargs="?", default="notebooks/style.py", help="notebook or stylesheet")
+    p.add_argument("--json", action="store_true", help="machine-readable output for CI")
+    p.add_argument("--rule", action="append", choices=sorted(rules.RULES),
+                   help="only run this placement rule (repeatable; default: all)")
+    p.add_argument("--no-rules", action="store_true", help="skip the layer-placement rules")
+    p.add_argument("--domain-noun", action="append", default=[], metavar="WORD",
+                   help="extra word that marks a component class as app code")
+    p.add_argument("--no-cache", action="store_true", help="re-index every statement")
+    p.set_defaults(func=cmd_lint)
+
+    p = sub.add_parser("unlayered", help="find style rules outside every @layer")
+    p.add_argument("notebook", nargs="?", default="notebooks/style.py")
+    p.add_argument("--sarif", metavar="FILE", help="write a SARIF log ('-' for stdout)")
+    p.add_argument("--fix", action="store_true",
+                   help="wrap each rule in its owning layer, in place, in the notebook")
+    p.set_defaults(func=cmd_unlayered)
+
+    p = sub.add_parser("layers", help="effective @layer order across every stylesheet a page loads")
+    p.add_argument("sources", nargs="+", help="a page (its stylesheets, in link order) or stylesheets in load order")
+    p.add_argument("--rules", action="store_true", help="list every rule under the layer it lands in")
+    p.set_defaults(func=cmd_layers)
+
+    p = sub.add_parser("audit", help="parse, lint and cost every stylesheet in the tree in parallel")
+    p.add_argument("patterns", nargs="*", help="globs to audit (default: %s)" % " ".join(audit.SOURCES))
+    p.add_argument("--root", default=".", help="directory the globs are relative to")
+    p.add_argument("-j", "--jobs", type=int, help="worker processes (default: one per cpu)")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_audit)
+
+    p = sub.add_parser("deps", help="custom-property dependency graph: chain depth, fan-out, cycles")
+    p.add_argument("source", nargs="?", default="notebooks/style.py", help="notebook or stylesheet")
+    p.add_argument("--token", type=custom_property,
+                   help="show one custom property's chain and neighbours; the leading -- is optional (--token _bg)")
+    p.add_argument("--top", type=int, default=10, help="rows per ranking (default: %(default)s)")
+    p.add_argument("--json", action="store_true", help="dump the graph")
+    p.set_defaults(func=cmd_deps)
+
+    p = sub.add_parser("contrast", help="WCAG 2 and APCA contrast over the whole colour input space")
+    p.add_argument("source", nargs="?", default="notebooks/style.py",
+                   help="notebook or stylesheet whose theme contexts to check")
+    p.add_argument("--configs", action="append", default=[], metavar="FILE",
+                   help="JSON of named --cfg-color-* sets to check as well (repeatable)")
+    p.add_argument("--no-themes", action="store_true", help="only check --configs")
+    p.add_argument("--pair", action="append", choices=(*contrast.PAIRS, "flip"),
+                   help="only list regions of this pair (repeatable; default: all)")
+    p.add_argument("--bg-steps", type=int, default=contrast.Grid.bg_steps,
+                   help="--bg samples from -1 to 1 (default: %(default)s)")
+    p.add_argument("--hue-step", type=float, default=contrast.Grid.hue_step,
+                   help="degrees between hue samples (default: %(default)s)")
+    p.add_argument("-j", "--jobs", type=int, help="worker processes (default: one per cpu)")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_contrast)
+
+    p = sub.add_parser("gamut", help="out-of-gamut share per config, clamped-chroma tables, fallbacks")
+    p.add_argument("source", nargs="?", default="notebooks/style.py",
+                   help="notebook or stylesheet whose theme contexts and presets to use")
+    p.add_argument("--configs", action="append", default=[], metavar="FILE",
+                   help="JSON of named --cfg-color-* sets to check as well (repeatable)")
+    p.add_argument("--no-themes", action="store_true", help="only check --configs")
+    p.add_argument("--bg-steps", type=int, default=gamut.Grid.bg_steps,
+                   help="--bg samples from -1 to 1 (default: %(default)s)")
+    p.add_argument("--hue-step", type=float, default=gamut.Grid.hue_step,
+                   help="degrees between hue samples (default: %(default)s)")
+    p.add_argument("-o", "--output", help="write the (hue, --bg) clamped-chroma tables (.json or .npz)")
+    p.add_argument("--css", metavar="FILE",
+                   help="write --cfg-color-vivid-c caps for sRGB and P3 displays for the first config")
+    p.set_defaults(func=cmd_gamut)
+
+    p = sub.add_parser("presets", help="compile the palette presets and regenerate the colour tour page")
+    p.add_argument("--data", default=presets.PRESETS, help="preset definitions (default: %(default)s)")
+    p.add_argument("--page", default=presets.PAGE, help="page to regenerate (default: %(default)s)")
+    p.add_argument("--css", metavar="FILE", help="also write every preset as a theme-layer block")
+    p.add_argument("--swatches", metavar="FILE", help="also write the swatch tables as JSON")
+    p.add_argument("-j", "--jobs", type=int, help="worker processes (default: one per cpu)")
+    p.set_defaults(func=cmd_presets)
+
+    p = sub.add_parser("ramp", help="solve a theme's surface-ramp parameters from the steps between depths")
+    p.add_argument("--top-l", type=float, nargs="+", required=True, help="depth-0 lightness(es), percent")
+    p.add_argument("--step", type=float, nargs="+", required=True,
+                   help="the step between consecutive depths, or four of them (0→1 … 3→4)")
+    p.add_argument("--metric", choices=ramp.METRICS, default="wcag",
+                   help="wcag: contrast ratio; l: OKLCH lightness in percent (default: %(default)s)")
+    p.add_argument("--hue", type=float, nargs="+", help="brand hue(s) to solve for (default: the theme's)")
+    p.add_argument("--curve-k", type=float, default=0.6, help="held fixed (default: %(default)s)")
+    p.add_argument("--max-error", type=float, default=ramp.MAX_ERROR * 100, metavar="PERCENT",
+                   help="largest deviation of a step from its target (default: %(default)g%%)")
+    p.add_argument("--css", action="store_true", help="print the solutions as rules")
+    p.add_argument("--selector", default=":root",
+                   help="rule selector for --css; {top_l} and {hue} are filled in (default: %(default)s)")
+    p.set_defaults(func=cmd_ramp)
+
+    p = sub.add_parser("cost", help="rank rules by selector matching and invalidation cost")
+    p.add_argument("source", nargs="?", default="notebooks/style.py", help="notebook or stylesheet")
+    p.add_argument("--top", type=int, default=20, help="rules to show (default: %(default)s)")
+    p.add_argument("--json", action="store_true")
+    p.add_argument("-o", "--output", help="write every rule's cost as JSON, for a later --baseline")
+    p.add_argument("--baseline", help="previous --output; exit 1 if a rule is new and costly or got costlier")
+    p.add_argument("--threshold", type=float, default=cost.THRESHOLD,
+                   help="score ratio that counts as a regression (default: %(default)s)")
+    p.set_defaults(func=cmd_cost)
+
+    p = sub.add_parser("bench", help="time every pipeline stage on synthetic scaled-up notebooks")
+    p.add_argument("--scales", type=int, nargs="+", default=list(bench.SCALES),
+                   help="copies of the notebook's css cells per run (default: %(default)s)")
+    p.add_argument("--stages", nargs="+", help="only these stages (default: all)")
+    p.add_argument("--repeat", type=int, default=3, help="runs per stage; the best counts")
+    p.add_argument("-o", "--output", help="write the results as JSON")
+    p.add_argument("--baseline", help="results JSON to compare against; exit 1 on a regression")
+    p.add_argument("--tolerance", type=float, default=bench.TOLERANCE,
+                   help="slowdown factor that counts as a regression (default: %(default)s)")
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("watch", help="rebuild on save, serve the tree and hot-swap css in open pages")
+    p.add_argument("notebook", nargs="?", default="notebooks/style.py")
+    p.add_argument("-o", "--output", default="dist/style.css", help="minified bundle to rebuild (default: %(default)s)")
+    p.add_argument("-d", "--directory", default=".", help="directory to serve (default: %(default)s)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("-p", "--port", type=int, default=8000)
+    p.set_defaults(func=cmd_watch)
+
+    args = parser.parse_args(argv)
+    args.func(args)
 
 
 if __name__ == "__main__":
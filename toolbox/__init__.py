@@ -0,0 +1,11 @@
+"""Build and analysis tooling for the toolbox CSS system."""
+
+from .extract import Block, Cell, bundle, cells, extract
+from .lexer import Token, tokenize, tokenize_file
+from .parse import AtRule, Decl, Rule, parse, parse_file, serialize, walk
+
+__all__ = [
+    "AtRule", "Block", "Cell", "Decl", "Rule", "Token",
+    "bundle", "cells", "extract", "parse", "parse_file", "serialize",
+    "tokenize", "tokenize_file", "walk",
+]
@@ -0,0 +1,135 @@
+"""Lint and analysis results cached per top-level block.
+
+A stylesheet is cut into its top-level statements (each ``@layer`` block,
+rule, ``@property``…) with a scan that only tracks comments, strings and
+brackets. Each statement's lint ``Index`` and placement-rule findings are
+cached under the sha256 of its text (plus the tool version), with lines
+relative to the statement; a run re-indexes only the statements it has not
+seen and shifts the rest into place. The merged index and the whole-sheet
+findings are cached under the sheet's own hash as well, so an unchanged
+sheet costs two reads.
+
+Two per-tenant theme variants that differ in a few ``:root`` values share
+every other statement, so linting the second one re-tokenizes only the
+changed ``:root`` rule.
+``depgraph.load`` builds its graph from the same cached index.
+"""
+
+import json
+import re
+from collections.abc import Iterable
+from dataclasses import astuple, dataclass
+from pathlib import Path
+
+from . import rules
+from .cache import CACHE_DIR, Store, digest
+from .lint import SEVERITIES, Index, Issue
+from .lint import index as index_text
+from .lint import lint as lint_index
+from .parse import parse
+
+_SCAN = re.compile(r"/\*.*?(?:\*/|\Z)|\"(?:\\.|[^\"\\\n])*\"?|'(?:\\.|[^'\\\n])*'?|[{}()\[\];]", re.S)
+_LEADING = re.compile(r"\s*")
+
+
+@dataclass
+class Stats:
+    blocks: int = 0
+    hits: int = 0
+    sheet: bool = False  # the whole sheet's index came from the cache
+    findings: bool = False  # and so did its findings
+
+    def __str__(self):
+        parts = ["index from cache" if self.sheet else f"{self.hits}/{self.blocks} blocks from cache"]
+        if self.findings:
+            parts.append("findings from cache")
+        return ", ".join(parts)
+
+
+def blocks(css: str) -> list[tuple[int, str]]:
+    """Top-level statements of ``css`` as ``(first line, text)``, in order."""
+    out = []
+    start = depth = parens = 0
+    for m in _SCAN.finditer(css):
+        c = m.group()
+        if c in "([":
+            parens += 1
+        elif c in ")]":
+            parens = max(parens - 1, 0)
+        elif parens:
+            continue
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth = max(depth - 1, 0)
+            if not depth:
+                start = _cut(css, start, m.end(), out)
+        elif c == ";" and not depth:
+            start = _cut(css, start, m.end(), out)
+    _cut(css, start, len(css), out)
+    return out
+
+
+def _cut(css: str, start: int, end: int, out: list[tuple[int, str]]) -> int:
+    skip = _LEADING.match(css, start, end).end()
+    if skip < end:
+        out.append((css.count("\n", 0, skip) + 1, css[skip:end]))
+    return end
+
+
+def _block_index(text: str, store: Store, stats: Stats) -> Index:
+    key = store.key(digest(text))
+    cached = store.get(key)
+    stats.blocks += 1
+    if cached is not None:
+        stats.hits += 1
+        return Index.from_json(json.loads(cached))
+    idx = index_text(text)
+    store.put(key, json.dumps(idx.to_json()))
+    return idx
+
+
+def index(css: str, cache_dir: str | Path = CACHE_DIR, stats: Stats | None = None) -> Index:
+    """``lint.index(css)``, assembled from cached per-statement indexes."""
+    stats = stats if stats is not None else Stats()
+    store = Store("index", cache_dir)
+    key = store.key("sheet", digest(css))
+    cached = store.get(key)
+    if cached is not None:
+        stats.sheet = True
+        return Index.from_json(json.loads(cached))
+    idx = Index()
+    for line, text in blocks(css):
+        idx.extend(_block_index(text, store, stats), line - 1)
+    store.put(key, json.dumps(idx.to_json()))
+    return idx
+
+
+def lint(css: str, codes: Iterable[str] | None = (), domain_nouns: Iterable[str] = (),
+         cache_dir: str | Path = CACHE_DIR, stats: Stats | None = None) -> tuple[Index, list[Issue]]:
+    """The index and issues of ``css``: ``lint.lint`` plus the placement rules in ``codes``
+    (``None`` for all, empty for none), computed only for what the cache has not seen."""
+    stats = stats if stats is not None else Stats()
+    idx = index(css, cache_dir, stats)
+    codes = sorted(rules.RULES) if codes is None else sorted(codes)
+    nouns = sorted(domain_nouns)
+    findings = Store("findings", cache_dir)
+    key = findings.key(digest(css), *codes, "", *nouns)
+    cached = findings.get(key)
+    if cached is not None:
+        stats.findings = True
+        return idx, [Issue(*i) for i in json.loads(cached)]
+    issues = lint_index(idx)
+    if codes:
+        context = digest(*sorted(rules.core_tokens(idx)), "", *codes, "", *nouns)
+        placed = Store("rules", cache_dir)
+        for line, text in blocks(css):
+            block_key = placed.key(digest(text), context)
+            found = placed.get(block_key)
+            if found is None:
+                found = json.dumps([astuple(i) for i in rules.check(parse(text), idx, codes, nouns)])
+                placed.put(block_key, found)
+            issues += [Issue(s, c, m, l + line - 1) for s, c, m, l in json.loads(found)]
+    issues.sort(key=lambda i: (SEVERITIES.index(i.severity), i.line))
+    findings.put(key, json.dumps([astuple(i) for i in issues]))
+    return idx, issues
@@ -0,0 +1,96 @@
+"""Content-hashed, precompressed assets plus a manifest.
+
+``publish`` copies each stylesheet to ``<stem>.<hash>.css`` and writes its
+brotli, gzip and zstd variants next to it at maximum compression, so a
+server can send them with far-future ``Cache-Control: immutable`` and never
+compress per request. ``manifest.json`` maps each logical name to its
+hashed file and the size of every variant.
+
+Codecs run on a thread pool; zlib, brotli and zstd all release the GIL
+while compressing. gzip is always available; zstd needs Python 3.14's
+``compression.zstd`` (or the ``zstandard`` package) and brotli the
+``brotli`` package. A missing codec is skipped and left out of the manifest.
+"""
+
+import gzip
+import hashlib
+import json
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+HASH_LENGTH = 6
+
+
+def _gzip() -> Callable[[bytes], bytes]:
+    # mtime=0 keeps the output byte-identical across builds.
+    return lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli() -> Callable[[bytes], bytes] | None:
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return lambda data: brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)
+
+
+def _zstd() -> Callable[[bytes], bytes] | None:
+    try:
+        from compression import zstd
+    except ImportError:
+        try:
+            import zstandard
+        except ImportError:
+            return None
+        level = zstandard.MAX_COMPRESSION_LEVEL
+        return lambda data: zstandard.ZstdCompressor(level=level).compress(data)
+    level = zstd.CompressionParameter.compression_level.bounds()[1]
+    return lambda data: zstd.compress(data, level=level)
+
+
+def codecs() -> dict[str, Callable[[bytes], bytes]]:
+    """Available encodings, keyed by file suffix."""
+    found = {"br": _brotli(), "gz": _gzip(), "zst": _zstd()}
+    return {suffix: fn for suffix, fn in found.items() if fn is not None}
+
+
+def hashed_name(name: str, data: bytes, length: int = HASH_LENGTH) -> str:
+    path = Path(name)
+    digest = hashlib.sha256(data).hexdigest()[:length]
+    return str(path.with_name(f"{path.stem}.{digest}{path.suffix}"))
+
+
+def _write(path: Path, data: bytes) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not path.exists() or path.read_bytes() != data:
+        path.write_bytes(data)
+    return len(data)
+
+
+def publish(files: dict[str, bytes], out_dir: str | Path, jobs: int | None = None) -> dict:
+    """Write hashed and precompressed copies of ``files`` (logical name → bytes) under ``out_dir``.
+
+    Returns the manifest, which is also written to ``out_dir/manifest.json``.
+    """
+    out_dir = Path(out_dir)
+    available = codecs()
+    manifest: dict[str, dict] = {}
+    with ThreadPoolExecutor(jobs) as pool:
+        pending: list = []
+        for name, data in files.items():
+            hashed = hashed_name(name, data)
+            entry = manifest[name] = {"file": hashed, "size": len(data)}
+            pending.append((entry, None, pool.submit(_write, out_dir / hashed, data)))
+            for suffix, compress in available.items():
+                target = f"{hashed}.{suffix}"
+                entry[suffix] = {"file": target}
+                job = pool.submit(lambda c=compress, d=data, t=out_dir / target: _write(t, c(d)))
+                pending.append((entry, suffix, job))
+        for entry, suffix, job in pending:
+            size = job.result()
+            if suffix:
+                entry[suffix]["size"] = size
+    text = json.dumps(manifest, indent=2, sort_keys=True) + "\n"
+    _write(out_dir / "manifest.json", text.encode())
+    return manifest
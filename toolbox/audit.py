@@ -0,0 +1,135 @@
+"""Audit every stylesheet in the tree at once.
+
+``audit`` runs parse, lint (with the placement rules) and selector cost
+over each file on a process pool and yields each file's ``Result`` as soon
+as it finishes, with the time every stage took. Notebooks are extracted
+first and their lines point back into the notebook. ``report`` merges the
+findings of all files, errors first.
+
+The tree holds several generations of the system side by side, so each
+result also names the colour API a file registers: the ``--bg`` input of
+the notebooks or the older ``--color`` mode switch of ``static/core.css``.
+"""
+
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import analysis, cost
+from .build import LEGACY, NOTEBOOK
+from .cache import CACHE_DIR
+from .extract import bundle, cells, locate
+from .lint import ERROR, SEVERITIES, WARNING, Index, Issue
+from .parse import parse
+
+SOURCES = ("static/*.css", "docs/color.css", "notebooks/*.css", NOTEBOOK, LEGACY)
+COSTLY = 200.0
+STAGES = ("read", "parse", "lint", "cost")
+
+
+@dataclass
+class Result:
+    path: str
+    size: int = 0
+    rules: int = 0
+    api: str = ""
+    issues: list[Issue] = field(default_factory=list)
+    seconds: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def total(self) -> float:
+        return sum(self.seconds.values())
+
+
+def sources(root: str | Path = ".", patterns: Iterable[str] = SOURCES) -> list[Path]:
+    root = Path(root)
+    found = [p for pattern in patterns for p in sorted(root.glob(pattern)) if p.is_file()]
+    return list(dict.fromkeys(found))
+
+
+def _api(idx: Index) -> str:
+    # The colour-mode input is the one registered as a number; in the older
+    # API --bg is the computed <color> and --color the switch.
+    for name in ("--bg", "--color"):
+        if any("<number>" in (r.syntax or "") for r in idx.properties.get(name, ())):
+            return name
+    return "-"
+
+
+def _audit(path: str, cache_dir: str) -> Result:
+    result = Result(path)
+    clock = time.perf_counter()
+
+    def lap(stage):
+        nonlocal clock
+        now = time.perf_counter()
+        result.seconds[stage] = now - clock
+        clock = now
+
+    try:
+        text = Path(path).read_text(encoding="utf-8")
+        if path.endswith(".py"):
+            cell_list = cells(text)
+            css = bundle(cell_list)
+            line = lambda n: found[1] if (found := locate(cell_list, n)) else n
+        else:
+            css, line = text, lambda n: n
+        result.size = len(css.encode())
+        lap("read")
+        nodes = list(parse(css))
+        lap("parse")
+        idx, issues = analysis.lint(css, None, cache_dir=cache_dir)
+        lap("lint")
+        costs = cost.rank(nodes)
+        lap("cost")
+    except (OSError, UnicodeDecodeError, SyntaxError, ValueError) as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+    result.rules = len(costs)
+    result.api = _api(idx)
+    result.issues = [Issue(i.severity, i.code, i.message, line(i.line)) for i in issues]
+    result.issues += [Issue(WARNING, "costly-selector", f"{c.selector} scores {c.score:.0f} "
+                            f"({'; '.join(c.reasons)})", line(c.line))
+                      for c in costs if c.score >= COSTLY]
+    return result
+
+
+def audit(paths: Iterable[str | Path], jobs: int | None = None,
+          cache_dir: str | Path = CACHE_DIR) -> Iterator[Result]:
+    """Audit ``paths`` on a process pool, yielding each result as it completes."""
+    paths = [str(p) for p in paths]
+    if jobs == 1:
+        for p in paths:
+            yield _audit(p, str(cache_dir))
+        return
+    with ProcessPoolExecutor(jobs) as pool:
+        for future in as_completed([pool.submit(_audit, p, str(cache_dir)) for p in paths]):
+            yield future.result()
+
+
+def progress(r: Result) -> str:
+    if r.error:
+        return f"{r.path:36} {r.error}"
+    counts = [sum(i.severity == s for i in r.issues) for s in SEVERITIES]
+    stages = "  ".join(f"{s} {r.seconds.get(s, 0) * 1000:5.1f}" for s in STAGES)
+    return (f"{r.path:36} {r.size:>8} B {r.rules:>4} rules  api {r.api:8} "
+            f"{counts[0]:>3} errors {counts[1]:>3} warnings  {r.total * 1000:6.1f} ms  ({stages})")
+
+
+def report(results: list[Result]) -> str:
+    found = sorted(((r.path, i) for r in results for i in r.issues),
+                   key=lambda f: (SEVERITIES.index(f[1].severity), f[0], f[1].line))
+    errors = sum(i.severity == ERROR for _, i in found)
+    lines = [f"FINDINGS  {len(results)} files, {errors} errors, {len(found) - errors} warnings", ""]
+    lines += [f"  {f'{path}:{i.line}':36} {i.severity:7} {i.code:26} {i.message}" for path, i in found]
+    return "\n".join(lines)
+
+
+def as_json(results: list[Result]) -> list[dict]:
+    return [{"path": r.path, "size": r.size, "rules": r.rules, "api": r.api, "error": r.error,
+             "seconds": r.seconds,
+             "issues": [{"severity": i.severity, "code": i.code, "message": i.message, "line": i.line}
+                        for i in r.issues]} for r in results]
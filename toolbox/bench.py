@@ -0,0 +1,174 @@
+"""Benchmarks for the build pipeline on synthetic, scaled-up notebooks.
+
+``synthesize`` writes a notebook shaped like ``notebooks/style.py`` with
+``scale`` copies of every CSS cell. Copy ``k`` renames every custom property
+(``--x`` → ``--x-k``) and class (``.btn`` → ``.btn-k``) but keeps the layer
+names, so the result has the same mix of ``@property`` registrations,
+``:where(*)`` blocks and nested components as the real system, spread over
+the same layers, with distinct symbols.
+
+``run`` times every stage on each scale and records its throughput and the
+peak memory it allocates:
+
+- ``extract``: notebook source → bundle
+- ``parse``: bundle → node tree
+- ``lint``: bundle → symbol index and issues
+- ``minify``: bundle → minified bundle
+- ``compress``: minified bundle through every available codec
+- ``purge``: bundle → nodes matching the repo's own pages
+
+Timings are the best of ``repeat`` runs; peak memory comes from one extra
+run under ``tracemalloc`` so tracing does not distort the timings. Results
+are plain JSON; ``compare`` flags stages that got slower than a baseline.
+"""
+
+import platform
+import subprocess
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from . import lexer
+from .assets import codecs
+from .build import NOTEBOOK
+from .extract import bundle, cells
+from .lexer import tokenize
+from .lint import index, lint
+from .minify import minify
+from .parse import parse
+from .purge import purge
+from .usage import scan
+
+SCALES = (10, 100, 1000)
+TEMPLATES = ("static", "docs", "notebooks/index.html")
+TOLERANCE = 1.25
+
+_CELL = '''
+
+@app.cell(hide_code=True)
+def _(mo):
+    mo.md(r"""
+    ## {title}
+
+    ```css
+{css}
+    ```
+    """)
+    return
+'''
+
+
+def rename(css: str, k: int) -> str:
+    """``css`` with every custom property and class name suffixed by ``-k``; layer names untouched."""
+    tokens = list(tokenize(css))
+    out = []
+    in_layer = False
+    for i, tok in enumerate(tokens):
+        text = tok.text
+        if tok.kind == lexer.AT:
+            in_layer = text == "@layer"
+        elif tok.kind in (lexer.LBRACE, lexer.SEMICOLON):
+            in_layer = False
+        elif tok.kind == lexer.IDENT and text.startswith("--"):
+            text = f"{text}-{k}"
+        elif (tok.kind == lexer.IDENT and not in_layer and i
+              and tokens[i - 1].kind == lexer.DELIM and tokens[i - 1].text == "."):
+            text = f"{text}-{k}"
+        out.append(text)
+    return "".join(out)
+
+
+def synthesize(scale: int, source: str | Path = NOTEBOOK) -> str:
+    """Notebook source with ``scale`` renamed copies of every CSS cell of ``source``."""
+    styled = [c for c in cells(Path(source).read_text(encoding="utf-8")) if c.blocks]
+    parts = ["import marimo\n\napp = marimo.App()\n\n\n@app.cell\ndef _():\n"
+             "    import marimo as mo\n\n    return (mo,)\n"]
+    for k in range(scale):
+        for cell in styled:
+            css = cell.css if k == 0 else rename(cell.css, k)
+            body = "\n".join(f"    {line}" if line else line for line in css.split("\n"))
+            parts.append(_CELL.format(title=f"cell {cell.index} copy {k}", css=body))
+    parts.append('\n\nif __name__ == "__main__":\n    app.run()\n')
+    return "".join(parts)
+
+
+def _stages(source: str) -> dict[str, tuple[Callable[[], object], int]]:
+    """Stage name → (callable, input size in bytes)."""
+    css = bundle(cells(source))
+    small = minify(css).encode()
+    usage = scan(TEMPLATES)
+    available = codecs()
+    return {
+        "extract": (lambda: bundle(cells(source)), len(source.encode())),
+        "parse": (lambda: list(parse(css)), len(css.encode())),
+        "lint": (lambda: lint(index(css)), len(css.encode())),
+        "minify": (lambda: minify(css), len(css.encode())),
+        "compress": (lambda: [c(small) for c in available.values()], len(small)),
+        "purge": (lambda: purge(parse(css), usage), len(css.encode())),
+    }
+
+
+def _measure(fn: Callable[[], object], size: int, repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "mb_s": size / best / 1e6 if best else None,
+            "input_bytes": size, "peak_bytes": peak}
+
+
+def _commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def run(scales: tuple[int, ...] = SCALES, repeat: int = 3,
+        stages: list[str] | None = None, source: str | Path = NOTEBOOK) -> dict:
+    """Benchmark every stage on a synthetic notebook per scale."""
+    results = []
+    for scale in scales:
+        text = synthesize(scale, source)
+        table = _stages(text)
+        results.append({
+            "scale": scale,
+            "cells": sum(1 for c in cells(text) if c.blocks),
+            "stages": {name: _measure(fn, size, repeat) for name, (fn, size) in table.items()
+                       if not stages or name in stages},
+        })
+    return {"commit": _commit(), "python": platform.python_version(),
+            "codecs": sorted(codecs()), "repeat": repeat, "results": results}
+
+
+def report(data: dict) -> str:
+    lines = [f"{'scale':>6} {'cells':>6}  {'stage':10} {'ms':>10} {'MB/s':>8} {'peak MB':>9}"]
+    for r in data["results"]:
+        for name, s in r["stages"].items():
+            lines.append(f"{r['scale']:>6} {r['cells']:>6}  {name:10} {s['seconds'] * 1000:>10.1f}"
+                         f" {s['mb_s'] or 0:>8.2f} {s['peak_bytes'] / 1e6:>9.1f}")
+    return "\n".join(lines)
+
+
+def compare(data: dict, baseline: dict, tolerance: float = TOLERANCE) -> list[str]:
+    """One line per (scale, stage) that is more than ``tolerance`` times slower than ``baseline``."""
+    old = {(r["scale"], name): s["seconds"]
+           for r in baseline["results"] for name, s in r["stages"].items()}
+    slower = []
+    for r in data["results"]:
+        for name, s in r["stages"].items():
+            before = old.get((r["scale"], name))
+            if before and s["seconds"] > before * tolerance:
+                slower.append(f"{name} at {r['scale']}x: {before * 1000:.1f} ms -> "
+                              f"{s['seconds'] * 1000:.1f} ms ({s['seconds'] / before:.2f}x)")
+    return slower
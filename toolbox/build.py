@@ -0,0 +1,143 @@
+"""The build matrix: every stylesheet built from the notebooks.
+
+Each ``Target`` names an output file, the notebook it comes from and a
+render function. ``build`` parses every source notebook once in the parent
+process and hands the parsed cells to a process pool, so targets that share
+a notebook share the parse.
+
+Only two tracked files are targets, each with the renderer that reproduces
+it: the raw extracts ``style.css`` and ``notebooks/style.css``. Everything
+else — the minified bundle, its brotli copy and the per-section split — is
+generated into the untracked ``dist/``. The older ``static/*.css`` files
+(the API ``static/dashboard.html`` loads) and
+``notebooks/style_with_comments.css`` are not built from the notebooks and
+are left alone. The ``.br`` target needs the ``brotli`` package and is left
+out without it, like the codecs in ``assets``.
+"""
+
+import re
+import time
+from importlib.util import find_spec
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+from .extract import Cell, bundle, cells
+from .minify import minify
+
+NOTEBOOK = "notebooks/style.py"
+LEGACY = "style.py"
+OUT = "dist"
+
+_COMMENT = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/""", re.S)
+_BLANK_RUN = re.compile(r"\n(?:[ \t]*\n)+")
+_LAYER_BLOCK = re.compile(r"@layer\s+([\w.-]+)\s*\{")
+
+
+@dataclass(frozen=True)
+class Target:
+    output: str
+    source: str
+    render: Callable[[list[Cell]], str | bytes]
+
+    @property
+    def name(self) -> str:
+        """The output's logical name: its path, relative to ``OUT`` for generated files."""
+        path = Path(self.output)
+        return str(path.relative_to(OUT)) if path.is_relative_to(OUT) else self.output
+
+
+@dataclass(frozen=True)
+class Result:
+    output: str
+    size: int
+    written: bool
+    seconds: float
+
+
+def strip_comments(css: str) -> str:
+    css = _COMMENT.sub(lambda m: m.group(1) or "", css)
+    css = "\n".join(line.rstrip() for line in css.split("\n"))
+    return _BLANK_RUN.sub("\n\n", css).strip("\n") + "\n"
+
+
+def raw(cell_list: list[Cell]) -> str:
+    return bundle(cell_list)
+
+
+def stripped(cell_list: list[Cell]) -> str:
+    return strip_comments(bundle(cell_list))
+
+
+def minified(cell_list: list[Cell]) -> str:
+    return minify(bundle(cell_list))
+
+
+def section(cell: Cell, previous: str = "order") -> str:
+    """Which split file a cell belongs to, judged by the first layer block it opens.
+
+    Cells without a layer block stay with the section before them.
+    """
+    m = _LAYER_BLOCK.search(cell.css)
+    if m is None:
+        return previous
+    layer = m.group(1)
+    if layer.startswith("reset."):
+        return "reset"
+    if layer.startswith("core."):
+        return "core"
+    if layer == "theme":
+        return "themes"
+    return "app"
+
+
+def split(name: str, cell_list: list[Cell]) -> str:
+    picked, current = [], "order"
+    for cell in cell_list:
+        if cell.blocks:
+            current = section(cell, current)
+            if current == name:
+                picked.append(cell)
+    return bundle(picked)
+
+
+def brotli(render: Callable[[list[Cell]], str], cell_list: list[Cell]) -> bytes:
+    import brotli as _brotli
+    return _brotli.compress(render(cell_list).encode(), quality=11)
+
+
+MATRIX = [
+    Target("style.css", LEGACY, raw),
+    Target("notebooks/style.css", NOTEBOOK, raw),
+    *(Target(f"{OUT}/split/{name}.css", NOTEBOOK, partial(split, name))
+      for name in ("order", "reset", "core", "themes", "app")),
+    Target(f"{OUT}/style.css", NOTEBOOK, minified),
+    *([Target(f"{OUT}/style.css.br", NOTEBOOK, partial(brotli, minified))] if find_spec("brotli") else []),
+]
+
+
+def _run(target: Target, cell_list: list[Cell], root: Path) -> Result:
+    start = time.perf_counter()
+    out = target.render(cell_list)
+    data = out.encode() if isinstance(out, str) else out
+    path = root / target.output
+    written = not path.exists() or path.read_bytes() != data
+    if written:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return Result(target.output, len(data), written, time.perf_counter() - start)
+
+
+def build(targets: list[Target] = MATRIX, root: str | Path = ".",
+          jobs: int | None = None) -> list[Result]:
+    """Build ``targets`` under ``root`` on a process pool, in matrix order."""
+    root = Path(root)
+    parsed = {src: cells((root / src).read_text(encoding="utf-8"))
+              for src in dict.fromkeys(t.source for t in targets)}
+    if jobs == 1:
+        return [_run(t, parsed[t.source], root) for t in targets]
+    with ProcessPoolExecutor(jobs) as pool:
+        futures = [pool.submit(_run, t, parsed[t.source], root) for t in targets]
+        return [f.result() for f in futures]
@@ -0,0 +1,66 @@
+"""Content-addressed on-disk cache.
+
+Entries are plain files named by the sha256 of their key parts, fanned out
+into two-character directories. Writes go through a temp file and
+``os.replace`` so a killed build never leaves a half-written entry behind.
+
+Every key also includes ``SOURCE``, a hash of the toolbox's own modules, so
+editing any of them (the minifier, a lint rule, the colour model) misses
+every entry written before instead of serving stale results.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+VERSION = "0.1.0"
+CACHE_DIR = Path(".toolbox-cache")
+
+
+def _source_hash() -> str:
+    h = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        h.update(path.name.encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+SOURCE = _source_hash()
+
+
+def digest(*parts: str) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class Store:
+    """A namespace of cached text blobs under ``root``.
+
+    Keys include ``SOURCE``, so changing the tooling invalidates everything
+    it wrote before.
+    """
+
+    def __init__(self, namespace: str, root: str | Path = CACHE_DIR):
+        self.dir = Path(root) / namespace
+
+    def key(self, *parts: str) -> str:
+        return digest(SOURCE, *parts)
+
+    def _path(self, key: str) -> Path:
+        return self.dir / key[:2] / key[2:]
+
+    def get(self, key: str) -> str | None:
+        try:
+            return self._path(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
@@ -0,0 +1,224 @@
+"""The ``core.color`` formula in NumPy.
+
+``resolve`` computes what the browser computes for ``--_bg``, ``--border``,
+``--Border``, ``--accent`` and ``--color`` from the formula's inputs
+(``--bg``, ``--hue``/``--hue-shift``, ``--depth``, ``--fg-contrast``,
+``--fg-chroma``, ``--fg-hue``, ``--l-shift``, ``--c-shift``) and a
+``Config`` of ``--cfg-color-*`` values. Every input may be an array; they
+broadcast against each other, so a grid of millions of combinations is one
+call. The steps are the notebook's, one line each, including the clamps
+the browser applies (``clamp(4%, …, 97%)`` on ``--_bg``, lightness to
+[0, 1] and chroma to ≥ 0 in the relative colours).
+
+Colours come back as ``Oklch`` (lightness 0–1, as ``l`` reads in relative
+colour syntax) and convert to OKLab, linear or encoded sRGB and Display P3
+with the CSS Color 4 matrices.
+"""
+
+from dataclasses import dataclass, fields, replace
+from typing import NamedTuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+# CSS Color 4: OKLab -> non-linear LMS -> XYZ (D65) -> linear RGB.
+_OKLAB_TO_LMS = np.array([
+    [1.0, 0.3963377773761749, 0.2158037573099136],
+    [1.0, -0.1055613458156586, -0.0638541728258133],
+    [1.0, -0.0894841775298119, -1.2914855480194092],
+])
+_LMS_TO_XYZ = np.array([
+    [1.2268798758459243, -0.5578149944602171, 0.2813910456659647],
+    [-0.0405757452148008, 1.1122868032803170, -0.0717110580655164],
+    [-0.0763729366746601, -0.4214933324022432, 1.5869240198367816],
+])
+_XYZ_TO_SRGB = np.array([
+    [12831 / 3959, -329 / 214, -1974 / 3959],
+    [-851781 / 878810, 1648619 / 878810, 36519 / 878810],
+    [705 / 12673, -2585 / 12673, 705 / 667],
+])
+_XYZ_TO_P3 = np.array([
+    [446124 / 178915, -333277 / 357830, -72051 / 178915],
+    [-14852 / 17905, 63121 / 35810, 423 / 17905],
+    [11844 / 330415, -50337 / 660830, 316169 / 330415],
+])
+_OKLAB_TO_SRGB = _XYZ_TO_SRGB @ _LMS_TO_XYZ
+_OKLAB_TO_P3 = _XYZ_TO_P3 @ _LMS_TO_XYZ
+GAMUT_EPSILON = 1e-6
+
+
+@dataclass(frozen=True)
+class Config:
+    """``--cfg-color-*`` values; lightnesses in percent, as the CSS writes them."""
+    hue: ArrayLike = 220.0
+    surf_chroma: ArrayLike = 0.018
+    alpha: ArrayLike = 1.0
+    muted_l: ArrayLike = 90.0
+    muted_c: ArrayLike = 0.05
+    vivid_l: ArrayLike = 20.0
+    vivid_c: ArrayLike = 0.4
+    top_l: ArrayLike = 88.0
+    base_step: ArrayLike = 4.0
+    curve_k: ArrayLike = 0.6
+    surf_mid: ArrayLike = 60.5
+    surf_rng: ArrayLike = 55.0
+
+    @classmethod
+    def from_css(cls, declarations: dict[str, str], base: "Config | None" = None) -> "Config":
+        """``base`` (the ``@property`` initial values) with the ``--cfg-color-*`` entries of
+        ``declarations`` applied; other properties are ignored."""
+        values = {}
+        for f in fields(cls):
+            value = declarations.get(property_name(f.name))
+            if value is not None:
+                values[f.name] = float(value.strip().rstrip("%"))
+        return replace(base or cls(), **values)
+
+    def css(self) -> dict[str, str]:
+        """The values as declarations, percentages where the property is one."""
+        out = {}
+        for f in fields(self):
+            value = float(getattr(self, f.name))
+            text = f"{value:g}%" if f.name in _PERCENT else f"{value:g}"
+            out[property_name(f.name)] = text
+        return out
+
+
+_PERCENT = {"muted_l", "vivid_l"}
+LIGHT = Config()
+DARK = replace(LIGHT, top_l=33.0, base_step=2.5, surf_chroma=0.010, surf_mid=33.5, surf_rng=27.5)
+THEMES = {"light": LIGHT, "dark": DARK}
+HUES = {"suc": 145.0, "inf": 240.0, "wrn": 75.0, "dgr": 25.0}
+
+
+def property_name(field_name: str) -> str:
+    return "--cfg-color-" + field_name.replace("_", "-")
+
+
+class Oklch(NamedTuple):
+    l: np.ndarray  # 0..1
+    c: np.ndarray
+    h: np.ndarray
+    alpha: np.ndarray
+
+    def oklab(self) -> np.ndarray:
+        """``(..., 3)`` OKLab."""
+        return np.stack(np.broadcast_arrays(*self._lab()), axis=-1)
+
+    def _lab(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rad = np.radians(self.h)
+        return self.l, self.c * np.cos(rad), self.c * np.sin(rad)
+
+    def linear_srgb(self) -> np.ndarray:
+        return _from_lab(*self._lab(), _OKLAB_TO_SRGB)
+
+    def linear_p3(self) -> np.ndarray:
+        return _from_lab(*self._lab(), _OKLAB_TO_P3)
+
+    def srgb(self) -> np.ndarray:
+        """``(..., 3)`` gamma-encoded sRGB, not clipped: values outside 0–1 are out of gamut."""
+        return encode(self.linear_srgb())
+
+    def p3(self) -> np.ndarray:
+        return encode(self.linear_p3())
+
+    def css(self) -> str:
+        """``oklch(…)`` for a scalar colour."""
+        alpha = float(self.alpha)
+        tail = "" if alpha >= 1 else f" / {alpha:.4g}"
+        return f"oklch({float(self.l) * 100:.2f}% {float(self.c):.4f} {float(self.h) % 360:.2f}{tail})"
+
+
+def _from_lab(l, a, b, matrix: np.ndarray) -> np.ndarray:
+    # Channel by channel on the unbroadcast inputs, then one stack: several
+    # times faster than a (..., 3) @ (3, 3) matmul over the full grid.
+    lms = []
+    for row in _OKLAB_TO_LMS:
+        x = l + row[1] * a + row[2] * b
+        lms.append(x * x * x)
+    return np.stack(np.broadcast_arrays(*(m[0] * lms[0] + m[1] * lms[1] + m[2] * lms[2] for m in matrix)),
+                    axis=-1)
+
+
+def encode(linear: np.ndarray) -> np.ndarray:
+    """The sRGB (and Display P3) transfer function, sign-preserving like CSS Color 4."""
+    a = np.abs(linear)
+    return np.sign(linear) * np.where(a <= 0.0031308, 12.92 * a, 1.055 * a ** (1 / 2.4) - 0.055)
+
+
+def decode(encoded: np.ndarray) -> np.ndarray:
+    a = np.abs(encoded)
+    return np.sign(encoded) * np.where(a <= 0.04045, a / 12.92, ((a + 0.055) / 1.055) ** 2.4)
+
+
+def in_gamut(linear: np.ndarray, epsilon: float = GAMUT_EPSILON) -> np.ndarray:
+    """Whether each ``(..., 3)`` linear RGB triple is inside its gamut."""
+    return np.all((linear >= -epsilon) & (linear <= 1 + epsilon), axis=-1)
+
+
+def luminance(linear_srgb: np.ndarray) -> np.ndarray:
+    """Relative luminance (Y) of linear sRGB, for WCAG 2."""
+    return linear_srgb @ np.array([0.2126729, 0.7151522, 0.0721750])
+
+
+@dataclass(frozen=True)
+class Palette:
+    """The formula's outputs; ``bg`` is ``--_bg`` (the input ``--bg`` is a number)."""
+    bg: Oklch
+    border: Oklch
+    Border: Oklch
+    accent: Oklch
+    color: Oklch
+    surf_l: np.ndarray  # --_surf-l, percent
+    k: np.ndarray  # --_k
+    dark: np.ndarray  # --_dark
+
+
+def surface_l(cfg: Config, depth: ArrayLike) -> np.ndarray:
+    """``--_surf-l`` in percent: the surface ramp at ``depth``."""
+    depth = np.asarray(depth, dtype=float)
+    naive = cfg.top_l - depth * cfg.base_step
+    t = (naive - cfg.surf_mid) / cfg.surf_rng
+    return naive - depth * cfg.base_step * cfg.curve_k * t * t
+
+
+def resolve(cfg: Config = LIGHT, *, bg: ArrayLike = -1.0, depth: ArrayLike = 0.0,
+            hue: ArrayLike = np.nan, hue_shift: ArrayLike = 0.0, fg_contrast: ArrayLike = 1.0,
+            fg_chroma: ArrayLike = 0.0, fg_hue: ArrayLike = np.nan, l_shift: ArrayLike = 0.0,
+            c_shift: ArrayLike = 0.0) -> Palette:
+    """The ``core.color`` outputs for every combination of the (broadcast) inputs.
+
+    ``hue`` and ``fg_hue`` are NaN where unset, as ``var(--hue, …)`` falls back.
+    """
+    bg = np.asarray(bg, dtype=float)
+    surf_l = surface_l(cfg, depth)
+
+    c01 = np.clip(bg, 0, 1)
+    col_l = cfg.muted_l + c01 * (np.asarray(cfg.vivid_l) - cfg.muted_l)
+    col_c = cfg.muted_c + c01 * (np.asarray(cfg.vivid_c) - cfg.muted_c)
+
+    k = np.clip(bg + 1, 0, 1)
+    l = surf_l * (1 - k) + col_l * k
+    c = cfg.surf_chroma * (1 - k) + col_c * k
+    h = np.where(np.isnan(hue), np.add(cfg.hue, hue_shift), hue)
+    dark = np.clip((60 - np.asarray(cfg.top_l, dtype=float)) / 30, 0, 1)
+
+    alpha = np.clip(np.asarray(cfg.alpha, dtype=float), 0, 1)
+    bg_l = np.clip(l + np.multiply(l_shift, 100), 4, 97) / 100
+    bg_c = np.maximum(c + np.multiply(c_shift, l / 100), 0)
+    surface = Oklch(bg_l, bg_c, h, alpha)
+
+    direction = dark * 2 - 1
+    border = _relative(surface, bg_l + direction * 0.14, bg_c * 0.3, h)
+    strong = _relative(surface, bg_l + direction * 0.22, np.clip(bg_c + 0.12, 0.08, 0.18), h + 8)
+
+    flip = np.clip((0.5 - bg_l) * 999, 0, 1)
+    color = _relative(surface, bg_l + (flip - bg_l) * fg_contrast, bg_c * np.subtract(1, fg_contrast) + fg_chroma,
+                      np.where(np.isnan(fg_hue), h, fg_hue))
+    return Palette(surface, border, strong, strong, color, surf_l, k, dark)
+
+
+def _relative(origin: Oklch, l, c, h) -> Oklch:
+    # oklch(from …) clamps lightness to 0–100% and chroma to ≥ 0; alpha is the origin's.
+    return Oklch(np.clip(l, 0, 1), np.maximum(c, 0), np.asarray(h, dtype=float), origin.alpha)
+
@@ -0,0 +1,285 @@
+"""Contrast of the ``core.color`` outputs over the whole input space.
+
+``sweep`` resolves a ``Grid`` of ``--bg`` × hue × depth × ``--fg-contrast``
+× ``--fg-chroma`` for one ``Config`` in a single ``color.resolve`` call and
+scores two pairs against ``--_bg``: ``--color`` (text) and ``--border``
+(non-text). Each pair gets a WCAG 2 ratio and an APCA Lc; colours outside
+sRGB are clipped per channel first, as a rough stand-in for the browser's
+gamut mapping, and ``--cfg-color-alpha`` is ignored (surfaces are scored as
+opaque).
+
+Failing cells are reported as ``Region``s: rectangles of ``--bg`` × hue
+with the depths they hold at, per ``--fg-contrast``/``--fg-chroma`` pair.
+The ``flip`` pair checks the black/white switch in ``--color``
+(``clamp(0, calc((0.5 - l) * 999), 1)``) at full contrast: it flips on
+OKLCH lightness 0.5, not where black and white have equal contrast, so
+it can pick a pole that fails where the other would pass, and within
+1/999 of 0.5 it blends the two into grey.
+
+Reports are cached under ``.toolbox-cache/contrast`` by the config's
+values, the grid and the thresholds, so re-checking hundreds of tenant
+configs only computes the new ones.
+"""
+
+import json
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+
+import numpy as np
+
+from .cache import CACHE_DIR, Store
+from .color import Config, Oklch, resolve
+from .fold import inputs
+from .parse import parse
+
+# APCA 0.0.98G-4g constants.
+_APCA_COEFFS = np.array([0.2126729, 0.7151522, 0.0721750])
+_BLACK_THRESHOLD, _BLACK_CLAMP = 0.022, 1.414
+_NORM_BG, _NORM_TEXT, _REV_BG, _REV_TEXT = 0.56, 0.57, 0.65, 0.62
+_SCALE, _OFFSET, _LOW_CLIP, _DELTA_Y_MIN = 1.14, 0.027, 0.1, 0.0005
+
+PAIRS = ("color", "border")
+METRICS = ("wcag", "apca")
+# WCAG 1.4.3 body text and 1.4.11 non-text; APCA Lc 60 for body text, 15 for non-text.
+THRESHOLDS = {("color", "wcag"): 4.5, ("color", "apca"): 60.0,
+              ("border", "wcag"): 3.0, ("border", "apca"): 15.0}
+
+
+@dataclass(frozen=True)
+class Grid:
+    bg_steps: int = 41
+    hue_step: float = 10.0
+    depths: tuple[float, ...] = (0, 1, 2, 3, 4)
+    fg_contrast: tuple[float, ...] = (1, 0.85, 0.8, 0.75, 0.7, 0.6, 0.4)
+    fg_chroma: tuple[float, ...] = (0, 0.05, 0.1)
+
+    def bg(self) -> np.ndarray:
+        return np.linspace(-1, 1, self.bg_steps)
+
+    def hue(self) -> np.ndarray:
+        return np.arange(0, 360, self.hue_step)
+
+    @property
+    def cells(self) -> int:
+        return self.bg_steps * len(self.hue()) * len(self.depths) * len(self.fg_contrast) * len(self.fg_chroma)
+
+
+@dataclass
+class Region:
+    pair: str  # color, border or flip
+    metric: str
+    bg: tuple[float, float]
+    hue: tuple[float, float]
+    depths: list[float]
+    fg_contrast: float | None = None  # None: the pair does not depend on it
+    fg_chroma: float | None = None
+    worst: float = 0.0
+
+
+@dataclass
+class Report:
+    name: str
+    config: dict[str, str]
+    cells: int = 0
+    failing: dict[str, float] = field(default_factory=dict)  # "pair metric" -> share of cells failing
+    regions: list[Region] = field(default_factory=list)
+    seconds: float = 0.0
+    cached: bool = False
+
+    def to_json(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != "regions"} | {
+            "regions": [asdict(r) for r in self.regions]}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Report":
+        regions = [Region(**{**r, "bg": tuple(r["bg"]), "hue": tuple(r["hue"])}) for r in data["regions"]]
+        return cls(**{**data, "regions": regions})
+
+
+def _srgb_linear(color: Oklch) -> np.ndarray:
+    return np.clip(color.linear_srgb(), 0, 1)
+
+
+def wcag(fg_linear: np.ndarray, bg_linear: np.ndarray) -> np.ndarray:
+    """WCAG 2 contrast ratio (1–21) of linear sRGB colours, either way round."""
+    a = fg_linear @ _APCA_COEFFS + 0.05
+    b = bg_linear @ _APCA_COEFFS + 0.05
+    return np.maximum(a, b) / np.minimum(a, b)
+
+
+def _apca_y(linear: np.ndarray) -> np.ndarray:
+    # APCA estimates screen luminance with a plain 2.4 power on the encoded values.
+    encoded = np.where(linear <= 0.0031308, 12.92 * linear, 1.055 * linear ** (1 / 2.4) - 0.055)
+    y = np.clip(encoded, 0, 1) ** 2.4 @ _APCA_COEFFS
+    return np.where(y < _BLACK_THRESHOLD, y + np.maximum(_BLACK_THRESHOLD - y, 0) ** _BLACK_CLAMP, y)
+
+
+def apca(text_linear: np.ndarray, bg_linear: np.ndarray) -> np.ndarray:
+    """APCA Lc of text on background: positive for dark on light, negative for light on dark."""
+    text, bg = _apca_y(text_linear), _apca_y(bg_linear)
+    normal = (bg ** _NORM_BG - text ** _NORM_TEXT) * _SCALE
+    reverse = (bg ** _REV_BG - text ** _REV_TEXT) * _SCALE
+    lc = np.where(bg > text, np.where(normal < _LOW_CLIP, 0, normal - _OFFSET),
+                  np.where(reverse > -_LOW_CLIP, 0, reverse + _OFFSET))
+    return np.where(np.abs(bg - text) < _DELTA_Y_MIN, 0, lc) * 100
+
+
+def _scores(fg: np.ndarray, bg: np.ndarray) -> dict[str, np.ndarray]:
+    return {"wcag": wcag(fg, bg), "apca": np.abs(apca(fg, bg))}
+
+
+def rectangles(mask: np.ndarray) -> list[tuple[tuple[int, ...], int, int, int, int]]:
+    """Cover each 2-d slice of a ``(..., rows, cols)`` mask with ``(index, row0, row1, col0,
+    col1)`` rectangles, inclusive: column runs that repeat on consecutive rows merge into one."""
+    lead, (n_rows, _) = mask.shape[:-2], mask.shape[-2:]
+    flat = mask.reshape(-1, *mask.shape[-2:]).astype(np.int8)
+    # Every row's runs in one pass: +1 where a run starts, -1 one past where it ends.
+    edges = np.diff(np.pad(flat, ((0, 0), (0, 0), (1, 1))), axis=-1)
+    starts, ends = np.nonzero(edges == 1), np.nonzero(edges == -1)
+    rows: dict[int, dict[int, set]] = {}
+    for k, row, c0, c1 in zip(*(a.tolist() for a in starts), (ends[2] - 1).tolist()):
+        rows.setdefault(k, {}).setdefault(row, set()).add((c0, c1))
+    out = []
+    for k, by_row in sorted(rows.items()):
+        index = tuple(int(i) for i in np.unravel_index(k, lead))
+        open_runs: dict[tuple[int, int], int] = {}
+        for i in range(n_rows):
+            runs = by_row.get(i, set())
+            for run in [r for r in open_runs if r not in runs]:
+                out.append((index, open_runs.pop(run), i - 1, *run))
+            for run in runs:
+                open_runs.setdefault(run, i)
+        out += [(index, start, n_rows - 1, *run) for run, start in sorted(open_runs.items())]
+    return out
+
+
+def _regions(pair: str, metric: str, values: np.ndarray, failing: np.ndarray, grid: Grid) -> list[Region]:
+    """Regions of a ``(depth, [fg-contrast, fg-chroma,] bg, hue)`` mask; the same rectangle at
+    several depths is one region."""
+    bg, hue = grid.bg(), grid.hue()
+    merged: dict[tuple, Region] = {}
+    for (d, *fg), b0, b1, h0, h1 in rectangles(failing):
+        worst = float(values[(d, *fg)][b0:b1 + 1, h0:h1 + 1].min())
+        key = (*fg, b0, b1, h0, h1)
+        if key in merged:
+            merged[key].depths.append(grid.depths[d])
+            merged[key].worst = min(merged[key].worst, worst)
+            continue
+        inputs = (grid.fg_contrast[fg[0]], grid.fg_chroma[fg[1]]) if fg else (None, None)
+        merged[key] = Region(pair, metric, (float(bg[b0]), float(bg[b1])), (float(hue[h0]), float(hue[h1])),
+                             [grid.depths[d]], *inputs, worst)
+    return sorted(merged.values(), key=lambda r: (r.fg_contrast is not None and -r.fg_contrast,
+                                                  r.fg_chroma or 0, r.depths[0], r.bg, r.hue))
+
+
+def sweep(cfg: Config, grid: Grid = Grid(), thresholds: dict = THRESHOLDS, name: str = "") -> Report:
+    """Score every cell of ``grid`` for ``cfg``."""
+    start = time.perf_counter()
+    depth = np.asarray(grid.depths, dtype=float)[:, None, None, None, None]
+    fg_contrast = np.asarray(grid.fg_contrast, dtype=float)[None, :, None, None, None]
+    fg_chroma = np.asarray(grid.fg_chroma, dtype=float)[None, None, :, None, None]
+    bg, hue = grid.bg()[:, None], grid.hue()[None, :]
+    p = resolve(cfg, bg=bg, hue=hue, depth=depth, fg_contrast=fg_contrast, fg_chroma=fg_chroma)
+    # --_bg and --border only vary with depth, --bg and hue: (depth, bg, hue).
+    surface = _srgb_linear(p.bg)[:, 0, 0]
+    border = _srgb_linear(p.border)[:, 0, 0]
+    text = _srgb_linear(p.color)
+    report = Report(name, cfg.css(), grid.cells)
+
+    for pair, fg, bg_ in (("color", text, surface[:, None, None]), ("border", border, surface)):
+        for metric, values in _scores(fg, bg_).items():
+            failing = values < thresholds[pair, metric]
+            report.failing[f"{pair} {metric}"] = float(failing.mean())
+            report.regions += _regions(pair, metric, values, failing, grid)
+
+    # The flip at full contrast: a pole that fails where the other would pass, or a grey blend.
+    flip = np.clip((0.5 - p.bg.l) * 999, 0, 1)[:, 0, 0]
+    white, black = wcag(np.ones(3), surface), wcag(np.zeros(3), surface)
+    picked = wcag(np.repeat(flip[..., None] ** 3, 3, axis=-1), surface)
+    limit = thresholds["color", "wcag"]
+    wrong = ((picked < limit) & (np.maximum(white, black) >= limit)) | ((flip > 0) & (flip < 1))
+    report.failing["flip wcag"] = float(wrong.mean())
+    report.regions += _regions("flip", "wcag", picked, wrong, grid)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def _key(cfg: Config, grid: Grid, thresholds: dict) -> list[str]:
+    return [json.dumps(cfg.css(), sort_keys=True), json.dumps(asdict(grid)),
+            json.dumps(sorted((f"{p} {m}", v) for (p, m), v in thresholds.items()))]
+
+
+def cached_sweep(name: str, cfg: Config, grid: Grid = Grid(), thresholds: dict = THRESHOLDS,
+                 cache_dir: str | Path = CACHE_DIR) -> Report:
+    store = Store("contrast", cache_dir)
+    key = store.key(*_key(cfg, grid, thresholds))
+    cached = store.get(key)
+    if cached is not None:
+        report = Report.from_json(json.loads(cached))
+        report.name, report.cached = name, True
+        return report
+    report = sweep(cfg, grid, thresholds, name)
+    store.put(key, json.dumps(report.to_json()))
+    return report
+
+
+def sweep_all(configs: Iterable[tuple[str, Config]], grid: Grid = Grid(), thresholds: dict = THRESHOLDS,
+              jobs: int | None = None, cache_dir: str | Path = CACHE_DIR) -> Iterator[Report]:
+    """``cached_sweep`` each named config on a process pool, in order."""
+    configs = list(configs)
+    if jobs == 1:
+        for name, cfg in configs:
+            yield cached_sweep(name, cfg, grid, thresholds, cache_dir)
+        return
+    with ProcessPoolExecutor(jobs) as pool:
+        futures = [pool.submit(cached_sweep, name, cfg, grid, thresholds, str(cache_dir)) for name, cfg in configs]
+        for future in futures:
+            yield future.result()
+
+
+def themes(css: str) -> list[tuple[str, Config]]:
+    """The distinct ``--cfg-color-*`` sets the theme contexts of ``css`` produce, named by
+    their first selector (and ``@media``)."""
+    found: dict[tuple, tuple[str, Config]] = {}
+    for ctx in inputs(list(parse(css))).contexts:
+        name = " ".join(filter(None, [f"@media {ctx.media}" if ctx.media else None, ctx.selector or ":root"]))
+        found.setdefault(tuple(sorted(ctx.config.css().items())), (name, ctx.config))
+    return list(found.values())
+
+
+def load_configs(path: str | Path, base: Config = Config()) -> list[tuple[str, Config]]:
+    """Tenant configs from JSON: ``{"name": {"--cfg-color-top-l": "33", …}, …}`` or a list of
+    such objects with a ``"name"`` key. Unset values come from ``base``."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    if isinstance(data, dict):
+        data = [{"name": name, **values} for name, values in data.items()]
+    return [(str(d.get("name", f"config-{i}")), Config.from_css({k: str(v) for k, v in d.items()}, base))
+            for i, d in enumerate(data)]
+
+
+def _span(values: list[float]) -> str:
+    if len(values) > 1 and np.allclose(np.diff(values), 1):
+        return f"{values[0]:g}–{values[-1]:g}"
+    return ",".join(f"{v:g}" for v in values)
+
+
+def _interval(lo: float, hi: float) -> str:
+    return f"{lo:+.2f}" if lo == hi else f"{lo:+.2f}…{hi:+.2f}"
+
+
+def table(report: Report, pairs: Iterable[str] = (*PAIRS, "flip")) -> str:
+    """The failing regions of ``report`` as one line each."""
+    pairs = list(pairs)
+    lines = [f"{report.name}  top-l {report.config['--cfg-color-top-l']}  {report.cells} cells"
+             f"{'  (cached)' if report.cached else f'  {report.seconds * 1000:.0f} ms'}"]
+    lines.append("  " + "  ".join(f"{k} {v:6.1%}" for k, v in report.failing.items()))
+    for r in report.regions:
+        if r.pair not in pairs:
+            continue
+        fg = "" if r.fg_contrast is None else f"fg-contrast {r.fg_contrast:<4g} fg-chroma {r.fg_chroma:<4g} "
+        lines.append(f"    {r.pair:6} {r.metric:4}  bg {_interval(*r.bg):13}  hue {r.hue[0]:>3.0f}–{r.hue[1]:<3.0f}"
+                     f"  depth {_span(r.depths):7}  {fg}worst {r.worst:.2f}")
+    return "\n".join(lines)
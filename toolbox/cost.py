@@ -0,0 +1,259 @@
+"""Selector matching and invalidation cost.
+
+Browsers match right to left: the subject (rightmost compound) decides how
+many elements are tried at all, then every combinator to its left walks
+the tree from each candidate. The score is a relative model of that work,
+not a measurement, but it ranks the shapes that dominate style recalc:
+
+- subject: the fraction of elements a rule is tried on — ``#id`` and
+  ``:root`` almost none, a class few, a tag or attribute more, and ``*``,
+  ``:where(*)`` or a bare pseudo-class every element;
+- combinators: a descendant or general-sibling combinator walks every
+  ancestor or sibling, a child or next-sibling combinator one;
+- ``:has()``: searches the candidate's subtree, once per descendant
+  combinator inside it, and makes every change in that subtree re-match
+  the rule (upward invalidation);
+- ``:is()``/``:where()``/``:not()``: their costliest argument.
+
+Nested rules are scored as the selector they resolve to (``&`` replaced by
+the parent, wrapped in ``:is()``). ``rank`` returns every rule, costliest
+first; ``compare`` flags rules that are new or got costlier than in a
+previous run's JSON.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from . import lexer
+from .lexer import Token, tokenize
+from .minify import compact
+from .parse import AtRule, Node, Rule, layer_of, walk
+from .purge import split_list
+
+# Share of the document a subject is tried on.
+SUBJECT = {"id": 0.01, "class": 0.05, "attribute": 0.2, "tag": 0.3, "universal": 1.0}
+COMBINATOR = {" ": 3.0, "~": 3.0, ">": 1.0, "+": 1.0}
+HAS = 10.0
+THRESHOLD = 1.2
+
+_ALTERNATIVES = {":is(", ":where(", ":matches(", ":-webkit-any("}
+_SINGLE = {"root", "host", "scope"}
+_RANK = ["id", "class", "attribute", "tag", "universal"]
+
+
+@dataclass(frozen=True, slots=True)
+class Cost:
+    selector: str
+    layer: str | None
+    line: int
+    subject: str
+    match: float
+    invalidation: float
+    reasons: tuple[str, ...]
+
+    @property
+    def score(self) -> float:
+        return round(self.match + self.invalidation, 2)
+
+    @property
+    def key(self) -> str:
+        return _key(self.layer, self.selector)
+
+
+def _key(layer: str | None, selector: str) -> str:
+    # Formatting-insensitive, so a minified build compares against a pretty one.
+    return f"{layer or ''}|{compact(selector, 'selector')}"
+
+
+def _compounds(tokens: list[Token]) -> tuple[list[list[Token]], list[str]]:
+    """Split a complex selector into compounds and the combinators between them."""
+    compounds: list[list[Token]] = [[]]
+    combinators: list[str] = []
+    depth = 0
+    pending = None
+    for tok in tokens:
+        if tok.kind in (lexer.FUNCTION, lexer.LPAREN, lexer.LBRACKET):
+            depth += 1
+        elif tok.kind in (lexer.RPAREN, lexer.RBRACKET):
+            depth -= 1
+        elif depth == 0 and (tok.kind == lexer.WS or (tok.kind == lexer.DELIM and tok.text in ">+~")):
+            if tok.kind == lexer.DELIM or pending is None:
+                pending = tok.text if tok.kind == lexer.DELIM else " "
+            continue
+        if pending is not None and compounds[-1]:
+            combinators.append(pending)
+            compounds.append([])
+        pending = None
+        compounds[-1].append(tok)
+    return [c for c in compounds if c] or [[]], combinators
+
+
+def _args(tokens: list[Token], i: int) -> tuple[str, int]:
+    depth, j = 1, i + 1
+    while j < len(tokens) and depth:
+        if tokens[j].kind in (lexer.FUNCTION, lexer.LPAREN):
+            depth += 1
+        elif tokens[j].kind == lexer.RPAREN:
+            depth -= 1
+        j += 1
+    return "".join(t.text for t in tokens[i + 1:j - 1]), j
+
+
+@dataclass
+class _Acc:
+    work: float = 0.0
+    invalidation: float = 0.0
+    has_depth: int = 0
+
+
+def _compound(tokens: list[Token], acc: _Acc, reasons: list[str], nested: int) -> str:
+    """Score the functional pseudo-classes of a compound into ``acc``; return its subject kind."""
+    kind = "universal"
+
+    def narrow(k):
+        nonlocal kind
+        if _RANK.index(k) < _RANK.index(kind):
+            kind = k
+
+    i = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok.kind == lexer.HASH:
+            narrow("id")
+        elif tok.kind == lexer.DELIM and tok.text == "." and i + 1 < len(tokens):
+            narrow("class")
+            i += 1
+        elif tok.kind == lexer.LBRACKET:
+            narrow("attribute")
+            while i < len(tokens) and tokens[i].kind != lexer.RBRACKET:
+                i += 1
+        elif tok.kind == lexer.IDENT and (i == 0 or tokens[i - 1].kind != lexer.COLON):
+            narrow("tag")
+        elif tok.kind == lexer.IDENT and tok.text.lower() in _SINGLE:
+            narrow("id")
+        elif tok.kind == lexer.FUNCTION and i and tokens[i - 1].kind == lexer.COLON:
+            name = ":" + tok.text.lower()
+            inner, end = _args(tokens, i)
+            if name == ":has(":
+                subtree = 0
+                for branch in split_list(inner):
+                    sub = _Acc()
+                    _complex(branch, sub, reasons, nested + 1)
+                    hops = branch.lstrip()[:1] in ("+", ">", "~")
+                    subtree = max(subtree, sub.work + (1 if hops else COMBINATOR[" "]))
+                    acc.has_depth = max(acc.has_depth, nested + 1 + sub.has_depth)
+                acc.work += HAS * subtree
+                acc.invalidation += HAS * subtree
+                reasons.append(f":has({inner.strip()})")
+            elif name in _ALTERNATIVES or name == ":not(":
+                best, best_kind = _Acc(), "id"
+                for branch in split_list(inner):
+                    sub = _Acc()
+                    k = _complex(branch, sub, reasons, nested)
+                    if sub.work > best.work:
+                        best = sub
+                    if _RANK.index(k) > _RANK.index(best_kind):
+                        best_kind = k
+                acc.work += best.work
+                acc.invalidation += best.invalidation
+                acc.has_depth = max(acc.has_depth, best.has_depth)
+                if name != ":not(":
+                    narrow(best_kind)
+            i = end
+            continue
+        i += 1
+    return kind
+
+
+def _complex(selector: str, acc: _Acc, reasons: list[str], nested: int = 0) -> str:
+    """Add the work of one complex selector to ``acc``; return its subject kind."""
+    tokens = [t for t in tokenize(selector.strip()) if t.kind != lexer.COMMENT]
+    while tokens and (tokens[0].kind == lexer.WS or (tokens[0].kind == lexer.DELIM and tokens[0].text in ">+~")):
+        tokens.pop(0)  # relative selector inside :has()
+    compounds, combinators = _compounds(tokens)
+    subject = "universal"
+    for n, compound in enumerate(compounds):
+        kind = _compound(compound, acc, reasons, nested)
+        if n == len(compounds) - 1:
+            subject = kind
+    for c in combinators:
+        acc.work += COMBINATOR[c]
+        if c in " ~":
+            reasons.append("descendant combinator" if c == " " else "general sibling combinator")
+    return subject
+
+
+def resolve(selector: str, parents: list[str]) -> str:
+    """The selector a nested rule stands for, given its ancestors' selectors (outermost first)."""
+    for parent in reversed(parents):
+        outer = f":is({parent})"
+        selector = ", ".join(branch.replace("&", outer) if "&" in branch else f"{outer} {branch}"
+                             for branch in split_list(selector))
+    return selector
+
+
+def score(selector: str, layer: str | None = None, line: int = 0) -> Cost:
+    """Cost of a (resolved) selector list: the costliest branch, since every branch is tried."""
+    worst: tuple[float, float, str, list[str]] | None = None
+    for branch in split_list(selector):
+        acc, reasons = _Acc(), []
+        subject = _complex(branch, acc, reasons)
+        share = SUBJECT[subject]
+        match = 100 * share * (1 + acc.work)
+        invalidation = acc.invalidation * (1 + acc.has_depth)
+        if subject == "universal":
+            reasons.insert(0, "universal subject")
+            if len(_compounds(list(tokenize(branch)))[0]) > 1:
+                invalidation += 10  # a change on any ancestor restyles its whole subtree
+        if worst is None or match + invalidation > worst[0] + worst[1]:
+            worst = (match, invalidation, subject, reasons)
+    match, invalidation, subject, reasons = worst or (0.0, 0.0, "universal", [])
+    return Cost(selector, layer, line, subject, round(match, 2), round(invalidation, 2),
+                tuple(dict.fromkeys(reasons)))
+
+
+def rank(nodes: Iterable[Node]) -> list[Cost]:
+    """Every style rule in ``nodes``, costliest first."""
+    out = []
+    for node, ancestors in walk(nodes):
+        if not isinstance(node, Rule):
+            continue
+        if any(isinstance(a, AtRule) and a.name.endswith("keyframes") for a in ancestors):
+            continue
+        parents = [a.prelude for a in ancestors if isinstance(a, Rule)]
+        selector = resolve(node.prelude, parents) if parents else node.prelude
+        out.append(score(selector, layer_of(ancestors), node.line))
+    return sorted(out, key=lambda c: -c.score)
+
+
+def as_json(costs: list[Cost]) -> list[dict]:
+    return [{"selector": c.selector, "layer": c.layer, "line": c.line, "subject": c.subject,
+             "match": c.match, "invalidation": c.invalidation, "score": c.score,
+             "reasons": list(c.reasons)} for c in costs]
+
+
+def compare(costs: list[Cost], baseline: list[dict], threshold: float = THRESHOLD) -> list[str]:
+    """Rules that are new and above the old median, or costlier than ``threshold`` × their old score."""
+    old = {_key(b["layer"], b["selector"]): b["score"] for b in baseline}
+    scores = sorted(old.values())
+    median = scores[len(scores) // 2] if scores else 0
+    out = []
+    for c in costs:
+        before = old.get(c.key)
+        if before is None:
+            if c.score > median:
+                out.append(f"new   {c.score:>8.1f}          {c.selector}")
+        elif c.score > before * threshold:
+            out.append(f"worse {c.score:>8.1f} (was {before:.1f}) {c.selector}")
+    return out
+
+
+def report(costs: list[Cost], top: int = 20) -> str:
+    total = sum(c.score for c in costs)
+    lines = [f"{len(costs)} rules, total cost {total:.0f}", "",
+             f"{'score':>8} {'match':>8} {'inval':>7}  {'line':>5}  selector"]
+    for c in costs[:top]:
+        lines.append(f"{c.score:>8.1f} {c.match:>8.1f} {c.invalidation:>7.1f}  {c.line:>5}  {c.selector}")
+        if c.reasons:
+            lines.append(f"{'':>33}{'; '.join(c.reasons)}")
+    return "\n".join(lines)
@@ -0,0 +1,94 @@
+"""Per-page critical CSS.
+
+The critical subset of a bundle for one page is what first paint needs:
+``@property`` registrations, ``@layer`` order statements, everything in
+``core.*``, and every other rule — layered or not — whose selector could
+match an element in the page's initial markup (types included, so ``pre``
+rules stay out of a page without ``<pre>``). It is inlined as a ``<style>``
+in ``<head>``; the page's render-blocking ``<link rel="stylesheet">`` tags
+(no ``media``, or ``all``/``screen``) become preloads that apply once
+loaded, keeping their order and every other attribute, with the original
+link as the ``<noscript>`` fallback. Links for other media (the ``print``
+chunk of ``split``) never block first paint and are left as they are.
+"""
+
+import re
+from pathlib import Path
+
+from .parse import Node, parse
+from .purge import purge
+from .usage import scan_html
+
+_LINK = re.compile(r"<link\b[^>]*\brel=[\"']?stylesheet[\"']?[^>]*>", re.I)
+_HREF = re.compile(r"""\bhref=["']?([^"'\s>]+)""", re.I)
+_ATTR = re.compile(r"""([^\s"'>/=]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s"'>]+))?""")
+_BLOCKING_MEDIA = frozenset({"", "all", "screen"})
+_HEAD_END = re.compile(r"</head\s*>", re.I)
+
+
+def _filterable(layer: str | None) -> bool:
+    return layer is None or not layer.startswith("core.")
+
+
+def critical(css: str, html: str) -> list[Node]:
+    """The nodes of ``css`` needed to paint ``html`` before any stylesheet loads."""
+    return purge(parse(css), scan_html(html), scope=_filterable, tags=True)
+
+
+def _attrs(link: str) -> dict[str, str | None]:
+    """Attributes of a ``<link …>`` tag, names lowercased, values unquoted."""
+    body = link[len("<link"):].rstrip(">").rstrip("/")
+    out = {}
+    for name, value in _ATTR.findall(body):
+        out[name.lower()] = value[1:-1] if value[:1] in "\"'" and value else (value or None)
+    return out
+
+
+def blocks_render(media: str) -> bool:
+    """Whether a stylesheet for ``media`` (``""`` when the link has none) blocks first paint."""
+    return media.strip().lower() in _BLOCKING_MEDIA
+
+
+def linked_stylesheets(html: str, base: str | Path) -> list[tuple[Path, str]]:
+    """Local stylesheets linked by ``html`` with their ``media`` (``""`` if none), in link
+    order, resolved against ``base``."""
+    out = []
+    for link in _LINK.findall(html):
+        m = _HREF.search(link)
+        if m and "://" not in m.group(1) and not m.group(1).startswith("//"):
+            out.append((Path(base) / m.group(1).split("?")[0], _attrs(link).get("media") or ""))
+    return out
+
+
+def _quoted(value: str) -> str:
+    # A value that was single-quoted may hold a double quote.
+    return value.replace('"', "&quot;")
+
+
+def _deferred(link: str) -> str:
+    attrs = _attrs(link)
+    if not attrs.get("href") or not blocks_render(attrs.get("media") or ""):
+        return link
+    kept = "".join(f" {name}" if value is None else f' {name}="{_quoted(value)}"'
+                   for name, value in attrs.items() if name not in ("rel", "as", "onload"))
+    return (f'<link rel="preload" as="style"{kept} '
+            f"onload=\"this.onload=null;this.rel='stylesheet'\">"
+            f"<noscript>{link}</noscript>")
+
+
+def inline(html: str, critical_css: str) -> str:
+    """Inline ``critical_css`` where the first stylesheet link was and defer every
+    render-blocking link."""
+    style = f"<style>{critical_css}</style>\n"
+    links = _LINK.findall(html)
+    if not links:
+        return _HEAD_END.sub(lambda m: style + m.group(), html, count=1)
+    first = True
+
+    def replace(m):
+        nonlocal first
+        out = (style if first else "") + _deferred(m.group())
+        first = False
+        return out
+
+    return _LINK.sub(replace, html)
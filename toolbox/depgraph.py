@@ -0,0 +1,208 @@
+"""Custom-property dependency graph.
+
+Every ``var(--x)`` inside the value of property ``p`` is an edge ``p → --x``
+("p depends on --x"). Nodes are custom properties; ordinary properties
+(``color``, ``border-color``…) appear as sinks that consume the chain. The
+edges come straight from the lint ``Index``, so building the graph costs
+one pass over the tokens.
+
+What it answers:
+
+- ``depth``: the longest chain of substitutions below a node — how many
+  ``var()`` resolutions the browser performs, in sequence, to compute it.
+- ``fan_out``: how many properties read a token directly.
+- ``cycles``: strongly connected components. A custom property in a cycle
+  is invalid at computed-value time, so e.g. ``--fg-contrast:
+  calc(var(--fg-contrast, 1) + 0.15)`` does not add to the inherited value:
+  it drops to the inherited value (or the initial value) instead.
+- ``per_element``: tokens declared by a rule whose subject is every element
+  (``*``, ``:where(*)``). Those are recomputed for each element in the
+  document; everything else is computed where it is declared and, unless
+  registered with ``inherits: false``, inherited from there.
+
+``load`` caches the graph as JSON under ``.toolbox-cache/depgraph`` keyed
+on the source's hash, so other tools can query it without re-tokenizing;
+on a miss it builds from ``analysis.index``, which re-tokenizes only the
+top-level statements it has not seen.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .cache import CACHE_DIR, Store, digest
+from .analysis import index
+from .lint import Index
+from .purge import split_list
+
+_LAST_COMPOUND = re.compile(r"(?:^|[\s>+~])([^\s>+~]+)$")
+_UNIVERSAL = {"*", ":where(*)", ":is(*)"}
+
+
+def universal(selector: str) -> bool:
+    """Whether some branch of ``selector`` has every element as its subject."""
+    for branch in split_list(selector):
+        m = _LAST_COMPOUND.search(branch.strip())
+        subject = m.group(1) if m else branch
+        if subject.split("::")[0] in _UNIVERSAL:
+            return True
+    return False
+
+
+@dataclass
+class Graph:
+    deps: dict[str, list[str]] = field(default_factory=dict)
+    layers: dict[str, list[str]] = field(default_factory=dict)
+    per_element: list[str] = field(default_factory=list)
+    non_inherited: list[str] = field(default_factory=list)
+
+    @property
+    def nodes(self) -> list[str]:
+        names = set(self.deps)
+        for targets in self.deps.values():
+            names.update(targets)
+        return sorted(names)
+
+    def dependents(self) -> dict[str, list[str]]:
+        out: dict[str, list[str]] = {}
+        for source, targets in self.deps.items():
+            for t in targets:
+                out.setdefault(t, []).append(source)
+        return out
+
+    def fan_out(self) -> dict[str, int]:
+        return {name: len(users) for name, users in self.dependents().items()}
+
+    def cycles(self) -> list[list[str]]:
+        """Strongly connected components with a cycle (including self-references)."""
+        return [c for c in self._components() if len(c) > 1 or c[0] in self.deps.get(c[0], ())]
+
+    def _components(self) -> list[list[str]]:
+        # Iterative Tarjan: the graph is small, but chains can be long.
+        order: dict[str, int] = {}
+        low: dict[str, int] = {}
+        stack: list[str] = []
+        on_stack: set[str] = set()
+        out = []
+        for root in self.nodes:
+            if root in order:
+                continue
+            work = [(root, iter(self.deps.get(root, ())))]
+            order[root] = low[root] = len(order)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, it = work[-1]
+                child = next(it, None)
+                if child is None:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == order[node]:
+                        comp = []
+                        while True:
+                            top = stack.pop()
+                            on_stack.discard(top)
+                            comp.append(top)
+                            if top == node:
+                                break
+                        out.append(sorted(comp))
+                elif child not in order:
+                    order[child] = low[child] = len(order)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(self.deps.get(child, ()))))
+                elif child in on_stack:
+                    low[node] = min(low[node], order[child])
+        return out
+
+    def depths(self) -> dict[str, tuple[int, str | None]]:
+        """Node → (longest chain below it, next node on that chain). Cycle edges are ignored."""
+        components = self._components()
+        component = {n: i for i, comp in enumerate(components) for n in comp}
+        memo: dict[str, tuple[int, str | None]] = {}
+        # Tarjan emits components dependencies-first, so one ordered sweep suffices.
+        for comp in components:
+            for node in comp:
+                best: tuple[int, str | None] = (0, None)
+                for dep in self.deps.get(node, ()):
+                    if component[dep] == component[node]:
+                        continue
+                    d = memo[dep][0] + 1
+                    if d > best[0]:
+                        best = (d, dep)
+                memo[node] = best
+        return memo
+
+    def chain(self, name: str, depths: dict | None = None) -> list[str]:
+        """The longest dependency chain from ``name`` down to an input."""
+        depths = depths or self.depths()
+        out = [name]
+        while (nxt := depths.get(out[-1], (0, None))[1]) is not None:
+            out.append(nxt)
+        return out
+
+    def to_json(self) -> dict:
+        return {"deps": self.deps, "layers": self.layers,
+                "per_element": self.per_element, "non_inherited": self.non_inherited}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Graph":
+        return cls(data["deps"], data["layers"], data["per_element"], data["non_inherited"])
+
+
+def build(idx: Index) -> Graph:
+    deps: dict[str, set[str]] = {}
+    layers: dict[str, set[str]] = {}
+    for name, sites in idx.references.items():
+        for site in sites:
+            if site.within:
+                deps.setdefault(site.within, set()).add(name)
+    per_element = set()
+    for name, sites in idx.declarations.items():
+        deps.setdefault(name, set())
+        for site in sites:
+            layers.setdefault(name, set()).add(site.layer or "")
+            if universal(site.selector):
+                per_element.add(name)
+    non_inherited = {n for n, regs in idx.properties.items()
+                     if any((r.inherits or "").strip() == "false" for r in regs)}
+    return Graph({k: sorted(v) for k, v in sorted(deps.items())},
+                 {k: sorted(v) for k, v in sorted(layers.items())},
+                 sorted(per_element), sorted(non_inherited))
+
+
+def load(css: str, cache_dir: str | Path = CACHE_DIR) -> Graph:
+    """The graph of ``css``, from the cache when this exact source was seen before."""
+    store = Store("depgraph", cache_dir)
+    key = store.key(digest(css))
+    cached = store.get(key)
+    if cached is not None:
+        return Graph.from_json(json.loads(cached))
+    graph = build(index(css, cache_dir))
+    store.put(key, json.dumps(graph.to_json()))
+    return graph
+
+
+def report(graph: Graph, top: int = 10) -> str:
+    depths = graph.depths()
+    fan = graph.fan_out()
+    custom = [n for n in graph.nodes if n.startswith("--")]
+    edges = sum(len(v) for v in graph.deps.values())
+    lines = [f"GRAPH\n  {len(custom)} custom properties, {edges} edges", "", "DEEPEST CHAINS"]
+    for name in sorted(custom, key=lambda n: (-depths[n][0], n))[:top]:
+        lines.append(f"  {depths[name][0]:>3}  {' → '.join(reversed(graph.chain(name, depths)))}")
+    lines += ["", "FAN-OUT"]
+    for name in sorted(fan, key=lambda n: (-fan[n], n))[:top]:
+        lines.append(f"  {fan[name]:>3}  {name}")
+    lines += ["", "CYCLES"]
+    lines += [f"  {' ↔ '.join(c) if len(c) > 1 else c[0] + ' (reads itself)'}"
+              for c in graph.cycles()] or ["  none"]
+    cost = sum(depths[n][0] for n in graph.per_element)
+    lines += ["", f"PER ELEMENT  {len(graph.per_element)} tokens, {cost} chained substitutions per element"]
+    for name in sorted(graph.per_element, key=lambda n: (-depths[n][0], n)):
+        scope = "not inherited" if name in graph.non_inherited else "inherited"
+        lines.append(f"  {depths[name][0]:>3}  {name:18} {scope:14} {', '.join(l or 'unlayered' for l in graph.layers.get(name, []))}")
+    return "\n".join(lines)
@@ -0,0 +1,117 @@
+"""Pull the CSS out of a marimo notebook without importing marimo.
+
+The notebooks keep every stylesheet module inside a ```css fence in a
+``mo.md(r\"\"\"...\"\"\")`` call. The bundle is those fence bodies, in cell
+order, joined by a newline — exactly what the exported ``style.css`` files
+contain. Parsing the notebook with ``ast`` gets us there in milliseconds;
+importing marimo costs seconds.
+"""
+
+import ast
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+FENCE = re.compile(r"```css[^\n]*\n(.*?)```", re.S)
+
+
+@dataclass(frozen=True, slots=True)
+class Block:
+    """One ```css fence. ``line`` is the 1-based notebook line of its first CSS line."""
+    text: str
+    line: int
+
+
+@dataclass(frozen=True, slots=True)
+class Cell:
+    """One ``@app.cell`` (or the ``with app.setup:`` block) in file order."""
+    index: int
+    lineno: int
+    code: str
+    blocks: tuple[Block, ...]
+
+    @property
+    def code_hash(self) -> str:
+        return hashlib.md5(self.code.encode()).hexdigest()
+
+    @property
+    def css(self) -> str:
+        return "\n".join(b.text for b in self.blocks)
+
+
+def _is_cell(node: ast.stmt) -> bool:
+    if isinstance(node, ast.With):
+        return any(_is_app_attr(item.context_expr, "setup") for item in node.items)
+    if not isinstance(node, ast.FunctionDef):
+        return False
+    return any(_is_app_attr(d.func if isinstance(d, ast.Call) else d, "cell")
+               for d in node.decorator_list)
+
+
+def _is_app_attr(node: ast.expr, attr: str) -> bool:
+    return (isinstance(node, ast.Attribute) and node.attr == attr
+            and isinstance(node.value, ast.Name) and node.value.id == "app")
+
+
+def _md_strings(cell: ast.stmt):
+    """Yield the string constants passed to ``mo.md(...)`` inside a cell."""
+    for node in ast.walk(cell):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr == "md" and node.args
+                and isinstance(node.args[0], ast.Constant)
+                and isinstance(node.args[0].value, str)):
+            yield node.args[0]
+
+
+def _code(source_lines: list[str], node: ast.stmt) -> str:
+    # The dedented body, without the generated trailing return.
+    body = node.body
+    if isinstance(body[-1], ast.Return):
+        body = body[:-1]
+    if not body:
+        return ""
+    lines = source_lines[body[0].lineno - 1:body[-1].end_lineno]
+    indent = min((len(l) - len(l.lstrip()) for l in lines if l.strip()), default=0)
+    return "".join(l[indent:] for l in lines).strip()
+
+
+def cells(source: str) -> list[Cell]:
+    """Parse notebook source into its cells, keeping every css fence with its line."""
+    tree = ast.parse(source)
+    source_lines = source.splitlines(keepends=True)
+    out = []
+    for node in tree.body:
+        if not _is_cell(node):
+            continue
+        blocks = []
+        for const in _md_strings(node):
+            # Raw strings map 1:1 onto the file, so offsets in the value are
+            # offsets from the line after the opening quotes' line.
+            for m in FENCE.finditer(const.value):
+                line = const.lineno + const.value.count("\n", 0, m.start(1))
+                blocks.append(Block(m.group(1), line))
+        blocks.sort(key=lambda b: b.line)
+        out.append(Cell(len(out), node.lineno, _code(source_lines, node), tuple(blocks)))
+    return out
+
+
+def bundle(cell_list: list[Cell]) -> str:
+    return "\n".join(b.text for c in cell_list for b in c.blocks)
+
+
+def locate(cell_list: list[Cell], line: int) -> tuple[Cell, int] | None:
+    """Map a 1-based line of ``bundle(cell_list)`` to its cell and notebook line."""
+    start = 1
+    for cell in cell_list:
+        for block in cell.blocks:
+            end = start + block.text.count("\n")
+            if line <= end:
+                return cell, block.line + line - start
+            start = end + 1
+    return None
+
+
+def extract(path: str | Path) -> str:
+    """Return the CSS bundle of the notebook at ``path``."""
+    return bundle(cells(Path(path).read_text(encoding="utf-8")))
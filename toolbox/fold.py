@@ -0,0 +1,198 @@
+"""Static colour folding: ``core.color`` with its outputs precomputed.
+
+At runtime every element re-evaluates the formula's ~15 registered custom
+properties. A page that never sets ``--bg`` (or other inputs) at runtime
+only ever sees a handful of input combinations — the theme, the surface
+depth, a semantic hue preset and a state class — and ``fold`` resolves
+each of them with ``color.resolve`` ahead of time:
+
+- the combinations come from the stylesheet itself: theme-layer rules that
+  set ``--cfg-color-*`` values (with their ``@media``), rules that set a
+  literal ``--hue`` (``.suc``…), literal ``--l-shift``/``--c-shift`` (the
+  states) and the ``.surface`` rules that set ``--depth``;
+- each one becomes a ``:where()`` rule that assigns ``--_bg``, ``--border``,
+  ``--Border``, ``--accent`` and ``--color`` as constants. The rules have
+  no specificity, so source order does the work: a context's combinations
+  follow the previous context's, and within one the more specific
+  (more inputs, deeper) come later;
+- depth applies to the surface itself, like ``--depth`` (not inherited);
+  theme, preset and state apply to the element and its descendants, like
+  the inputs they set. Between two nested presets the one emitted later
+  wins, not the nearest;
+- rules that set ``--fg-contrast``, ``--fg-chroma`` or ``--fg-hue`` keep
+  the runtime ``--color`` expression, now reading the folded ``--_bg``.
+  Self-referencing values (``.hover``'s ``--fg-contrast``) are invalid at
+  computed-value time, so the browser ignores them and so does the fold.
+
+The formula rule, the intermediate registrations, the ``--depth`` rules
+and the ``--_k`` background rule (``--bg`` is always -1 here, so it is
+transparent) are dropped. Given a ``Usage``, combinations that need a
+class or ``data-ui-*`` value no page uses are left out; without one every
+combination is emitted, which more than triples the bundle.
+"""
+
+import math
+from dataclasses import dataclass
+from itertools import product
+
+from .color import Config, Palette, resolve
+from .cost import resolve as resolve_selector
+from .lint import index
+from .parse import AtRule, Decl, Node, Rule, layer_of, parse, serialize, walk
+from .purge import could_match, split_list
+from .usage import Usage
+
+FORMULA_LAYER = "core.color"
+OUTPUTS = ("--_bg", "--border", "--Border", "--accent", "--color")
+INTERMEDIATES = frozenset({"--_naive", "--_t", "--_surf-l", "--_c01", "--_col-l", "--_col-c",
+                           "--_k", "--_l", "--_c", "--_h", "--_dark"})
+FG_INPUTS = ("--fg-contrast", "--fg-chroma", "--fg-hue")
+
+
+@dataclass(frozen=True)
+class Context:
+    media: str | None
+    selector: str | None  # None: the document default
+    config: Config
+
+
+@dataclass(frozen=True)
+class Variant:
+    selector: str
+    depth: float = 0.0
+    hue: float = math.nan
+    l_shift: float = 0.0
+    c_shift: float = 0.0
+
+
+@dataclass
+class Inputs:
+    contexts: list[Context]
+    depths: list[Variant]
+    presets: list[Variant]
+    states: list[Variant]
+    foreground: list[str]
+
+
+def _number(value: str) -> float | None:
+    try:
+        return float(value.strip().rstrip("%"))
+    except ValueError:
+        return None
+
+
+def _values(rule: Rule) -> dict[str, float]:
+    out = {}
+    for d in rule.children:
+        if isinstance(d, Decl) and d.name.startswith("--") and (n := _number(d.value)) is not None:
+            out[d.name] = n
+    return out
+
+
+def inputs(nodes: list[Node]) -> Inputs:
+    """The input combinations ``nodes`` can produce without runtime ``--bg`` tweaks."""
+    initial = {n: regs[0].initial for n, regs in index(serialize(nodes)).properties.items()
+               if regs[0].initial is not None}
+    base = Config.from_css(initial)
+    found = Inputs([Context(None, None, base)], [], [], [], [])
+    for node, ancestors in walk(nodes):
+        if not isinstance(node, Rule):
+            continue
+        values = _values(node)
+        media = [a.prelude for a in ancestors if isinstance(a, AtRule) and a.name == "media"]
+        parents = [a.prelude for a in ancestors if isinstance(a, Rule)]
+        selector = resolve_selector(node.prelude, parents) if parents else node.prelude
+        if any(n.startswith("--cfg-color-") for n in values):
+            declared = {n: d.value for d in node.children if isinstance(d, Decl) for n in [d.name]}
+            found.contexts.append(Context(" and ".join(media) or None, selector,
+                                          Config.from_css(declared, base)))
+        if "--depth" in values and layer_of(ancestors) == FORMULA_LAYER:
+            found.depths.append(Variant(selector, depth=values["--depth"]))
+        if "--hue" in values:
+            found.presets.append(Variant(selector, hue=values["--hue"]))
+        if "--l-shift" in values or "--c-shift" in values:
+            found.states.append(Variant(selector, l_shift=values.get("--l-shift", 0.0),
+                                        c_shift=values.get("--c-shift", 0.0)))
+        if any(isinstance(d, Decl) and d.name in FG_INPUTS and f"var({d.name}" not in d.value.replace(" ", "")
+               for d in node.children):
+            found.foreground.append(selector)
+    return found
+
+
+def _scoped(selector: str) -> str:
+    branches = split_list(selector)
+    return ", ".join(branches + [f"{b} *" for b in branches])
+
+
+def _declarations(p: Palette) -> list[Decl]:
+    return [Decl(name, getattr(p, attr).css()) for name, attr in
+            zip(OUTPUTS, ("bg", "border", "Border", "accent", "color"))]
+
+
+def combinations(found: Inputs, usage: Usage | None = None) -> list[Node]:
+    """One constant-valued rule per (context, depth, preset, state), in cascade order."""
+    keep = (lambda v: could_match(v.selector, usage)) if usage else (lambda v: True)
+    depths = [None, *filter(keep, found.depths)]
+    presets = [None, *filter(keep, found.presets)]
+    states = [None, *filter(keep, found.states)]
+    out: list[Node] = []
+    for ctx in found.contexts:
+        if ctx.selector and usage and not could_match(ctx.selector, usage):
+            continue
+        rules = []
+        for depth, preset, state in product(depths, presets, states):
+            parts = [f":where({_scoped(ctx.selector)})"] if ctx.selector else []
+            parts += [f":where({depth.selector})"] if depth else []
+            parts += [f":where({_scoped(v.selector)})" for v in (preset, state) if v]
+            palette = resolve(ctx.config, depth=depth.depth if depth else 0.0,
+                              hue=preset.hue if preset else math.nan,
+                              l_shift=state.l_shift if state else 0.0,
+                              c_shift=state.c_shift if state else 0.0)
+            rank = sum(v is not None for v in (depth, preset, state))
+            rules.append((rank, depth.depth if depth else 0.0,
+                          Rule("".join(parts) or ":where(*)", _declarations(palette))))
+        rules = [r for _, _, r in sorted(rules, key=lambda r: r[:2])]
+        out += [AtRule("media", ctx.media, rules)] if ctx.media else rules
+    return out
+
+
+def _is_formula(node: Node) -> bool:
+    return isinstance(node, Rule) and any(isinstance(d, Decl) and d.name == "--_naive" for d in node.children)
+
+
+def _reads_k(node: Node) -> bool:
+    return isinstance(node, Rule) and any(isinstance(d, Decl) and "var(--_k)" in d.value for d in node.children)
+
+
+def _rewrite(children: list[Node], layer: str | None, found: Inputs, usage: Usage | None,
+             expression: str) -> list[Node]:
+    out: list[Node] = []
+    for node in children:
+        if isinstance(node, AtRule) and node.name == "property" and node.prelude.strip() in INTERMEDIATES:
+            continue
+        if isinstance(node, AtRule) and node.name == "layer" and node.children is not None:
+            inner = ".".join(filter(None, [layer, node.prelude]))
+            out.append(AtRule("layer", node.prelude, _rewrite(node.children, inner, found, usage, expression),
+                              node.line))
+            continue
+        if layer == FORMULA_LAYER and isinstance(node, Rule):
+            if _is_formula(node):
+                kept = [d for d in node.children if not (isinstance(d, Decl) and d.name.startswith("--"))]
+                out.append(Rule(node.prelude, kept, node.line))
+                out += combinations(found, usage)
+                out += [Rule(f":where({_scoped(s)})", [Decl("--color", expression)]) for s in found.foreground]
+                continue
+            if _reads_k(node) or any(isinstance(d, Decl) and d.name == "--depth" for d in node.children):
+                continue
+        out.append(node)
+    return out
+
+
+def fold(css: str, usage: Usage | None = None) -> list[Node]:
+    """``css`` with the ``core.color`` formula replaced by precomputed colours."""
+    nodes = list(parse(css))
+    formula = next((n for n, _ in walk(nodes) if _is_formula(n)), None)
+    if formula is None:
+        raise ValueError(f"no {FORMULA_LAYER} formula rule (the one computing --_naive) to fold")
+    expression = next(d.value for d in formula.children if isinstance(d, Decl) and d.name == "--color")
+    return _rewrite(nodes, None, inputs(nodes), usage, expression)
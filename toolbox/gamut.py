@@ -0,0 +1,131 @@
+"""How much of the ``core.color`` output space falls outside sRGB and P3.
+
+With ``--cfg-color-vivid-c: 0.4`` most vivid ``--bg`` values ask for more
+chroma than any screen shows, and the browser gamut-maps every one of them
+at paint time. ``coverage`` measures the out-of-gamut share of each output
+over a ``--bg`` × hue × depth grid; ``chroma_lut`` finds, per (hue,
+``--bg``), the largest chroma at ``--_bg``'s lightness that is still in
+gamut — what a chroma-reducing gamut map lands on — by bisection over the
+whole grid at once.
+
+``vivid_limits`` turns the table into something CSS can use: the largest
+``--cfg-color-vivid-c`` per hue that keeps the whole ``--bg`` 0…1 ramp in
+gamut, and ``fallback_css`` emits it per hue preset behind
+``color-gamut`` media queries.
+"""
+
+import json
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import numpy as np
+
+from .color import Config, Oklch, in_gamut, resolve
+from .parse import AtRule, Decl, Node, Rule
+
+GAMUTS = ("srgb", "p3")
+OUTPUTS = ("bg", "border", "Border", "color")
+MEDIA = {"srgb": "not (color-gamut: p3)", "p3": "(color-gamut: p3) and (not (color-gamut: rec2020))"}
+BISECTIONS = 20
+
+
+def _linear(color: Oklch, gamut: str) -> np.ndarray:
+    return color.linear_srgb() if gamut == "srgb" else color.linear_p3()
+
+
+@dataclass(frozen=True)
+class Grid:
+    bg_steps: int = 1000
+    hue_step: float = 1.0
+    depths: tuple[float, ...] = (0, 1, 2, 3, 4)
+
+    def bg(self) -> np.ndarray:
+        return np.linspace(-1, 1, self.bg_steps)
+
+    def hue(self) -> np.ndarray:
+        return np.arange(0, 360, self.hue_step)
+
+
+def coverage(cfg: Config, grid: Grid = Grid()) -> dict[str, dict[str, float]]:
+    """Out-of-gamut share of each output, per gamut, over ``--bg`` × hue × depth."""
+    p = resolve(cfg, bg=grid.bg()[:, None], hue=grid.hue()[None, :],
+                depth=np.asarray(grid.depths, dtype=float)[:, None, None])
+    out: dict[str, dict[str, float]] = {}
+    for name in OUTPUTS:
+        color = getattr(p, name)
+        out[name] = {g: float(1 - in_gamut(_linear(color, g)).mean()) for g in GAMUTS}
+    return out
+
+
+def max_chroma(l: np.ndarray, h: np.ndarray, gamut: str = "srgb", ceiling: float = 0.5,
+               steps: int = BISECTIONS) -> np.ndarray:
+    """Largest in-gamut chroma at each (broadcast) OKLCH lightness (0–1) and hue."""
+    l, h = np.broadcast_arrays(np.asarray(l, dtype=float), np.asarray(h, dtype=float))
+    lo, hi = np.zeros(l.shape), np.full(l.shape, ceiling)
+    alpha = np.ones(l.shape)
+    for _ in range(steps):
+        mid = (lo + hi) / 2
+        ok = in_gamut(_linear(Oklch(l, mid, h, alpha), gamut))
+        lo, hi = np.where(ok, mid, lo), np.where(ok, hi, mid)
+    return lo
+
+
+def chroma_lut(cfg: Config, grid: Grid = Grid(), gamut: str = "srgb") -> np.ndarray:
+    """``(hue, --bg)`` table of ``--_bg``'s chroma at depth 0, clamped into ``gamut``."""
+    p = resolve(cfg, bg=grid.bg()[None, :], hue=grid.hue()[:, None])
+    l, c, h = np.broadcast_arrays(p.bg.l, p.bg.c, p.bg.h)
+    clamped = c.copy()
+    # Only cells out of gamut need the bisection; in-gamut ones keep their chroma.
+    out = ~in_gamut(_linear(p.bg, gamut))
+    if out.any():
+        clamped[out] = np.minimum(c[out], max_chroma(l[out], h[out], gamut, float(c[out].max())))
+    return clamped
+
+
+def vivid_limits(cfg: Config, hues: np.ndarray, gamut: str = "srgb", steps: int = 101) -> np.ndarray:
+    """Per hue, the largest ``--cfg-color-vivid-c`` (up to ``cfg``'s) that keeps ``--_bg`` in
+    gamut for every ``--bg`` from 0 to 1."""
+    t = np.linspace(0, 1, steps)[None, :]
+    hues = np.asarray(hues, dtype=float)[:, None]
+    ramp = resolve(replace(cfg, vivid_c=0.0), bg=t, hue=hues).bg
+    # --_bg's chroma is muted_c + t (vivid_c - muted_c); solve c(t) <= max_chroma(l(t)) for vivid_c.
+    ceiling = max_chroma(*np.broadcast_arrays(ramp.l, hues), gamut)
+    muted = float(cfg.muted_c)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bound = np.where(t > 0, muted + (ceiling - muted) / t, np.inf)
+    return np.clip(np.min(bound, axis=1), 0, float(cfg.vivid_c))
+
+
+def fallback_css(cfg: Config, presets: dict[str, float], gamuts=GAMUTS) -> list[Node]:
+    """``@media`` blocks that cap ``--cfg-color-vivid-c`` for the base hue and each preset
+    (``selector -> hue``) on displays that cannot show the full ramp."""
+    targets = {":where(:root)": float(cfg.hue), **presets}
+    out: list[Node] = []
+    for gamut in gamuts:
+        limits = vivid_limits(cfg, list(targets.values()), gamut)
+        rules = [Rule(selector, [Decl("--cfg-color-vivid-c", f"{limit:.3f}")])
+                 for selector, limit in zip(targets, limits) if limit < float(cfg.vivid_c) - 1e-3]
+        if rules:
+            out.append(AtRule("media", MEDIA[gamut], rules))
+    return [AtRule("layer", "theme", out)] if out else []
+
+
+def write_lut(path: str | Path, tables: dict[str, dict[str, np.ndarray]], grid: Grid) -> None:
+    """Write ``{config: {gamut: (hue, --bg) chroma}}``: compressed NumPy for ``.npz``, else JSON."""
+    path = Path(path)
+    if path.suffix == ".npz":
+        arrays = {f"{name}/{g}": table for name, per_gamut in tables.items() for g, table in per_gamut.items()}
+        np.savez_compressed(path, hue=grid.hue(), bg=grid.bg(), **arrays)
+        return
+    data = {"hue": grid.hue().tolist(), "bg": np.round(grid.bg(), 6).tolist(),
+            "chroma": {name: {g: np.round(table, 4).tolist() for g, table in per_gamut.items()}
+                       for name, per_gamut in tables.items()}}
+    path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+
+
+def report(name: str, cfg: Config, shares: dict[str, dict[str, float]]) -> str:
+    lines = [f"{name}  vivid-c {float(cfg.vivid_c):g}  hue {float(cfg.hue):g}"]
+    lines += [f"    {output:8} " + "  ".join(f"{g} {shares[output][g]:6.1%} out" for g in GAMUTS)
+              for output in OUTPUTS]
+    return "\n".join(lines)
+
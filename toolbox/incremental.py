@@ -0,0 +1,70 @@
+"""Incremental notebook builds keyed on a per-cell code hash.
+
+``Cell.code_hash`` is an md5 of the cell's dedented source, computed from
+the notebook file itself, so it needs no marimo session and covers cells
+edited since the last one. Each cell's processed CSS is cached under
+(stage, hash): editing one component re-processes one cell and splices it
+back between the cached fragments of all the others. marimo's session
+file, when there is one, only supplies the cell ids the report names.
+"""
+
+import json
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .cache import CACHE_DIR, Store
+from .extract import cells
+
+
+@dataclass
+class Rebuild:
+    output: Path
+    cells: int = 0
+    rebuilt: list[str] = field(default_factory=list)
+    written: bool = False
+
+    def __str__(self):
+        names = f" ({', '.join(self.rebuilt)})" if self.rebuilt else ""
+        return f"{self.output}: {len(self.rebuilt)}/{self.cells} cells rebuilt{names}"
+
+
+def session_ids(notebook: str | Path) -> list[str]:
+    """marimo's cell ids for ``notebook``, in file order, or ``[]`` if no session exists."""
+    notebook = Path(notebook)
+    session = notebook.parent / "__marimo__" / "session" / f"{notebook.name}.json"
+    try:
+        return [c["id"] for c in json.loads(session.read_text(encoding="utf-8"))["cells"]]
+    except (FileNotFoundError, KeyError, ValueError):
+        return []
+
+
+def rebuild(notebook: str | Path, output: str | Path, *,
+            stage: str = "extract", transform: Callable[[str], str] | None = None,
+            cache_dir: str | Path = CACHE_DIR) -> Rebuild:
+    """Write the bundle of ``notebook`` to ``output``, re-running ``transform`` only for changed cells.
+
+    ``stage`` names the transform in the cache key; two different transforms
+    must never share a stage name.
+    """
+    output = Path(output)
+    store = Store(stage, cache_dir)
+    ids = session_ids(notebook)
+    result = Rebuild(output)
+    parts = []
+    for cell in cells(Path(notebook).read_text(encoding="utf-8")):
+        if not cell.blocks:
+            continue
+        result.cells += 1
+        key = store.key(cell.code_hash)
+        css = store.get(key)
+        if css is None:
+            css = transform(cell.css) if transform else cell.css
+            store.put(key, css)
+            result.rebuilt.append(ids[cell.index] if cell.index < len(ids) else str(cell.index))
+        parts.append(css)
+    css = "\n".join(parts)
+    if not output.exists() or output.read_text(encoding="utf-8") != css:
+        output.write_text(css, encoding="utf-8")
+        result.written = True
+    return result
@@ -0,0 +1,185 @@
+"""Effective ``@layer`` order across every stylesheet a page loads.
+
+The browser builds one layer order per document. It reads the page's
+stylesheets (``<link rel="stylesheet">`` and ``<style>``) in document order
+and registers each layer the first time a name appears, in an order
+statement or in a block; a new sublayer goes after its existing siblings.
+Whatever a later file declares, it cannot move a layer that already exists.
+
+``resolve`` replays that over the sheets and reports:
+
+- ``late-layer``: first named by an order statement other than the page's
+  first one, so it sorts after everything registered before that sheet;
+- ``implicit-layer``: created by its ``@layer`` block, with no order
+  statement naming it first;
+- ``renamed-layer``: a layer the order statement puts in place that holds
+  no rules, next to late or implicit siblings that do (``layout.page``
+  ordered, ``layout.app``/``layout.doc`` written);
+- ``order-conflict``: a later statement lists two layers the other way
+  round; the browser ignores it.
+- ``invalid-layer``: a name with an empty segment (``block.``); the browser
+  drops the statement or block, rules and all.
+
+Every layer comes back in its effective position with the number of rules
+each sheet puts in it, followed by the unlayered rules, which beat them all.
+"""
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .critical import linked_stylesheets
+from .lint import ERROR, SEVERITIES, WARNING, Issue
+from .parse import AtRule, Rule, layer_names, layer_of, parse, walk
+
+_SHEET = re.compile(r"<link\b[^>]*>|<style\b[^>]*>(.*?)</style\s*>", re.I | re.S)
+_FIRST, _LATE, _BLOCK = "order", "late", "block"
+
+
+@dataclass(frozen=True, slots=True)
+class Sheet:
+    name: str
+    css: str
+    offset: int = 0  # lines before the css in ``name`` (inline <style>)
+
+
+@dataclass(slots=True)
+class Layer:
+    name: str
+    sheet: str
+    line: int
+    via: str  # "order" (the page's first statement), "late" or "block"
+    rules: dict[str, list[tuple[int, str]]] = field(default_factory=dict)
+    children: list["Layer"] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return sum(len(r) for r in self.rules.values())
+
+
+@dataclass
+class Cascade:
+    layers: list[Layer]  # effective order, weakest first
+    unlayered: dict[str, list[tuple[int, str]]]
+    issues: list[tuple[str, Issue]]  # (sheet, issue)
+
+
+def sheets(html: str, base: str | Path, page: str = "page") -> list[Sheet]:
+    """The local stylesheets and ``<style>`` blocks of ``html``, in document order."""
+    out = []
+    for m in _SHEET.finditer(html):
+        if m.group(1) is not None:
+            out.append(Sheet(page, m.group(1), html.count("\n", 0, m.start(1))))
+        else:
+            out.extend(Sheet(p.as_posix(), p.read_text(encoding="utf-8"))
+                       for p, _ in linked_stylesheets(m.group(), base) if p.is_file())
+    return out
+
+
+def _flatten(layers: list[Layer]) -> list[Layer]:
+    # A layer's own rules sit after its sublayers.
+    out = []
+    for layer in layers:
+        out += _flatten(layer.children)
+        out.append(layer)
+    return out
+
+
+def resolve(sheet_list: list[Sheet]) -> Cascade:
+    """Replay the browser's layer registration over ``sheet_list``."""
+    top: list[Layer] = []
+    by_name: dict[str, Layer] = {}
+    unlayered: dict[str, list[tuple[int, str]]] = {}
+    issues: list[tuple[str, Issue]] = []
+    first_seen = False
+
+    def issue(severity, code, message, sheet, line):
+        issues.append((sheet, Issue(severity, code, message, line)))
+
+    def register(name: str, sheet: Sheet, line: int, via: str) -> Layer:
+        parent, path = None, []
+        for part in name.split("."):
+            path.append(part)
+            dotted = ".".join(path)
+            if dotted not in by_name:
+                layer = Layer(dotted, sheet.name, line, via)
+                (parent.children if parent else top).append(layer)
+                by_name[dotted] = layer
+                if via != _FIRST:
+                    siblings = parent.children if parent else top
+                    after = siblings[-2].name if len(siblings) > 1 else (parent.name if parent else None)
+                    how = (f"is first named by the order statement at {sheet.name}:{line}" if via == _LATE
+                           else "is created by its block; no order statement names it")
+                    place = f"it sorts after {after}" if after else "it sorts first"
+                    issue(WARNING, "implicit-layer" if via == _BLOCK else "late-layer",
+                          f"@layer {dotted} {how}, so {place}", sheet.name, line)
+            parent = by_name[dotted]
+        return parent
+
+    for sheet in sheet_list:
+        for node, ancestors in walk(parse(sheet.css)):
+            line = node.line + sheet.offset
+            if isinstance(node, AtRule) and node.name == "layer":
+                outer = layer_of(ancestors)
+                invalid = [n for n in layer_names(node) if not all(n.split("."))]
+                if invalid:
+                    issue(ERROR, "invalid-layer", f"@layer {', '.join(invalid)} is not a valid layer name; "
+                          "the browser drops the whole rule", sheet.name, line)
+                elif node.children is None:
+                    names = [f"{outer}.{n}" if outer else n for n in layer_names(node)]
+                    via = _LATE if first_seen else _FIRST
+                    first_seen = True
+                    _conflicts(names, top, sheet, line, issue)
+                    for name in names:
+                        register(name, sheet, line, via)
+                elif node.prelude and all((name := layer_of(ancestors + (node,))).split(".")):
+                    register(name, sheet, line, _BLOCK)
+            elif isinstance(node, Rule) and not any(isinstance(a, Rule) for a in ancestors):
+                if any(isinstance(a, AtRule) and a.name.endswith("keyframes") for a in ancestors):
+                    continue
+                layer = layer_of(ancestors)
+                if layer is None:
+                    unlayered.setdefault(sheet.name, []).append((line, node.prelude))
+                elif layer in by_name:
+                    by_name[layer].rules.setdefault(sheet.name, []).append((line, node.prelude))
+
+    for layer in by_name.values():
+        if layer.via != _FIRST or layer.count or layer.children:
+            continue
+        siblings = next((l.children for l in by_name.values() if layer in l.children), top)
+        written = [s.name for s in siblings if s.via != _FIRST and s.count]
+        if written:
+            issue(WARNING, "renamed-layer",
+                  f"@layer {layer.name} is ordered but holds no rules, while {', '.join(written)} "
+                  f"(not in the order statement) do; was it renamed?", layer.sheet, layer.line)
+    issues.sort(key=lambda i: SEVERITIES.index(i[1].severity))
+    return Cascade(_flatten(top), unlayered, issues)
+
+
+def _conflicts(names, top, sheet, line, issue):
+    position = {l.name: n for n, l in enumerate(_flatten(top))}
+    known = [n for n in names if n in position]
+    for a, b in zip(known, known[1:]):
+        if position[b] < position[a]:
+            issue(ERROR, "order-conflict",
+                  f"@layer lists {b} after {a}, but {b} already sorts first; the browser keeps the earlier order",
+                  sheet.name, line)
+
+
+def report(cascade: Cascade, rules: bool = False) -> str:
+    lines = ["EFFECTIVE ORDER (weakest first)"]
+    shown = [l for l in cascade.layers if l.count or not l.children]  # bare parents are noise
+    for n, layer in enumerate(shown, 1):
+        mark = {_FIRST: " ", _LATE: "late", _BLOCK: "implicit"}[layer.via]
+        counts = ", ".join(f"{s} {len(r)}" for s, r in layer.rules.items()) or "no rules"
+        lines.append(f"  {n:>3}. {layer.name:28} {mark:9} {counts}")
+        if rules:
+            lines += [f"{'':17}{s}:{l}  {sel}" for s, r in layer.rules.items() for l, sel in r]
+    counts = ", ".join(f"{s} {len(r)}" for s, r in cascade.unlayered.items()) or "no rules"
+    lines.append(f"  {'':>3}  {'unlayered (beats every layer)':38} {counts}")
+    if rules:
+        lines += [f"{'':17}{s}:{l}  {sel}" for s, r in cascade.unlayered.items() for l, sel in r]
+    lines += ["", "ISSUES"]
+    lines += [f"  {f'{s}:{i.line}':28} {i.severity:7} {i.code:15} {i.message}"
+              for s, i in cascade.issues] or ["  none"]
+    return "\n".join(lines)
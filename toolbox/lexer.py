@@ -0,0 +1,115 @@
+"""Streaming CSS tokenizer.
+
+A single master regex over a sliding buffer. Input arrives as an iterable of
+text chunks; a token that touches the end of the buffer is held back until
+the next chunk (or EOF) proves it complete, so arbitrarily large generated
+files tokenize in constant memory.
+
+Tokens are ``(kind, text, line)`` tuples. Kinds are the short strings below;
+``text`` is the exact source text, so joining every token's text reproduces
+the input byte for byte.
+"""
+
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+COMMENT = "comment"
+WS = "ws"
+STRING = "string"
+NUMBER = "number"
+PERCENTAGE = "percentage"
+DIMENSION = "dimension"
+AT = "at"
+HASH = "hash"
+FUNCTION = "function"
+IDENT = "ident"
+COLON = ":"
+SEMICOLON = ";"
+COMMA = ","
+LBRACE = "{"
+RBRACE = "}"
+LPAREN = "("
+RPAREN = ")"
+LBRACKET = "["
+RBRACKET = "]"
+DELIM = "delim"
+
+_NAME = r"(?:[\w\-]|[^\x00-\x7f]|\\.)"
+_IDENT = rf"(?:--|-?(?:[a-zA-Z_]|[^\x00-\x7f]|\\.)){_NAME}*"
+_NUM = r"(?>[+-]?(?:\d*\.\d+|\d+)(?:[eE][+-]?\d+)?)"
+
+_TOKEN = re.compile(rf"""
+    (?P<{COMMENT}>/\*.*?\*/)
+  | (?P<{WS}>\s+)
+  | (?P<{STRING}>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<{DIMENSION}>{_NUM}{_IDENT})
+  | (?P<{PERCENTAGE}>{_NUM}%)
+  | (?P<{NUMBER}>{_NUM})
+  | (?P<{AT}>@{_IDENT})
+  | (?P<{HASH}>\#{_NAME}+)
+  | (?P<{FUNCTION}>{_IDENT}\()
+  | (?P<{IDENT}>{_IDENT})
+  | (?P<punct>[:;,{{}}()\[\]])
+  | (?P<{DELIM}>.)
+""", re.S | re.X)
+
+_BAD_STRING = re.compile(r"""["'](?:[^\n\\]|\\.)*""")
+_LOOKAHEAD = 4
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    line: int
+
+
+def _chunks(source: str | Iterable[str]) -> Iterable[str]:
+    return (source,) if isinstance(source, str) else source
+
+
+def tokenize(source: str | Iterable[str]) -> Iterator[Token]:
+    """Yield the tokens of ``source``, a string or an iterable of string chunks."""
+    buf, line = "", 1
+    chunks = iter(_chunks(source))
+    eof = False
+    while not eof:
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+        else:
+            buf += chunk
+        pos, end = 0, len(buf)
+        while pos < end:
+            m = _TOKEN.match(buf, pos)
+            kind = m.lastgroup
+            if not eof and kind not in (COMMENT, STRING) and m.end() > end - _LOOKAHEAD:
+                # Near the buffer edge a token may still grow with the next
+                # chunk ("1" -> "1e+5"); comments and strings end at their
+                # closing delimiter and are final once matched.
+                break
+            text = m.group()
+            if kind == "punct":
+                kind = text
+            elif kind == DELIM and buf.startswith("/*", pos):
+                # Unterminated comment: wait for its close, or swallow the
+                # rest of the input at EOF as browsers do.
+                if not eof:
+                    break
+                kind, text = COMMENT, buf[pos:]
+            elif kind == DELIM and text in "\"'":
+                # Unterminated string: a bad string that ends at the newline.
+                bad = _BAD_STRING.match(buf, pos)
+                if not eof and bad.end() == end:
+                    break
+                kind, text = STRING, bad.group()
+            yield Token(kind, text, line)
+            line += text.count("\n")
+            pos += len(text)
+        buf = buf[pos:]
+
+
+def tokenize_file(path: str | Path, chunk_size: int = 1 << 16) -> Iterator[Token]:
+    with open(path, encoding="utf-8") as f:
+        yield from tokenize(iter(lambda: f.read(chunk_size), ""))
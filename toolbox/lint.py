@@ -0,0 +1,327 @@
+"""Layer, ``@property`` and custom-property lint.
+
+``index`` makes one pass over the token stream and builds every symbol
+table the checks need: the ``@layer`` order statements, the layer blocks,
+``@property`` registrations, custom-property declarations and ``var()``
+references, each with its line and the layer it sits in. Statements are
+split the way ``parse`` splits them (on top-level ``;``, ``{`` and ``}``),
+but no tree is built, so linting is linear in the size of the bundle.
+
+``lint`` runs the checks over an ``Index``:
+
+- ``undefined-var``: ``var(--x)`` without a fallback, where ``--x`` is
+  neither declared nor registered with an ``initial-value``.
+- ``undeclared-layer``: a layer block missing from the order statement;
+  the browser appends it after every declared layer.
+- ``order-conflict``: a later ``@layer`` statement lists two layers in the
+  opposite order to an earlier one.
+- ``property-invalid``: an ``@property`` missing ``syntax`` or ``inherits``
+  (or ``initial-value`` with a non-universal syntax); browsers drop it.
+- ``property-conflict``: the same property registered twice, differently.
+
+``report`` prints the same sections as the old ``css_lint.log``; ``as_json``
+is the machine-readable form for CI.
+"""
+
+from collections.abc import Iterable
+from dataclasses import astuple, dataclass, field, replace
+from pathlib import Path
+
+from . import lexer
+from .lexer import Token, tokenize
+
+ERROR = "error"
+WARNING = "warning"
+SEVERITIES = (ERROR, WARNING)
+
+_OPEN = {lexer.LPAREN, lexer.LBRACKET, lexer.FUNCTION}
+_CLOSE = {lexer.RPAREN, lexer.RBRACKET}
+
+
+@dataclass(frozen=True, slots=True)
+class Site:
+    """Where a custom property is declared or referenced.
+
+    ``within`` is the property (custom or not) whose value holds a
+    reference; ``fallback`` whether ``var()`` gave one.
+    """
+    line: int
+    layer: str | None
+    selector: str = ""
+    within: str | None = None
+    fallback: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class Registration:
+    name: str
+    line: int
+    syntax: str | None
+    inherits: str | None
+    initial: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class Issue:
+    severity: str
+    code: str
+    message: str
+    line: int
+
+
+@dataclass
+class Index:
+    orders: list[tuple[int, list[str]]] = field(default_factory=list)
+    layers: dict[str, list[int]] = field(default_factory=dict)
+    properties: dict[str, list[Registration]] = field(default_factory=dict)
+    declarations: dict[str, list[Site]] = field(default_factory=dict)
+    references: dict[str, list[Site]] = field(default_factory=dict)
+
+    @property
+    def order(self) -> list[str]:
+        """Declared layer order: every order statement's names, first occurrence wins."""
+        seen: dict[str, None] = {}
+        for _, names in self.orders:
+            seen.update((n, None) for n in names if n not in seen)
+        return list(seen)
+
+    def extend(self, other: "Index", offset: int = 0) -> None:
+        """Append ``other``'s entries, its lines moved down by ``offset``."""
+        self.orders += [(line + offset, names) for line, names in other.orders]
+        for name, lines in other.layers.items():
+            self.layers.setdefault(name, []).extend(l + offset for l in lines)
+        for name, regs in other.properties.items():
+            self.properties.setdefault(name, []).extend(replace(r, line=r.line + offset) for r in regs)
+        for table, mine in ((other.declarations, self.declarations), (other.references, self.references)):
+            for name, sites in table.items():
+                mine.setdefault(name, []).extend(replace(s, line=s.line + offset) for s in sites)
+
+    def to_json(self) -> dict:
+        return {"orders": self.orders, "layers": self.layers,
+                "properties": {n: [astuple(r) for r in regs] for n, regs in self.properties.items()},
+                "declarations": {n: [astuple(s) for s in sites] for n, sites in self.declarations.items()},
+                "references": {n: [astuple(s) for s in sites] for n, sites in self.references.items()}}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Index":
+        return cls([(line, names) for line, names in data["orders"]], data["layers"],
+                   {n: [Registration(*r) for r in regs] for n, regs in data["properties"].items()},
+                   {n: [Site(*s) for s in sites] for n, sites in data["declarations"].items()},
+                   {n: [Site(*s) for s in sites] for n, sites in data["references"].items()})
+
+
+@dataclass(slots=True)
+class _Frame:
+    kind: str  # "layer", "property", "rule" or "at"
+    layer: str | None
+    selector: str = ""
+    name: str = ""
+    line: int = 0
+    descriptors: dict[str, str] = field(default_factory=dict)
+
+
+def _text(tokens: list[Token]) -> str:
+    return " ".join("".join(t.text if t.kind != lexer.WS else " " for t in tokens).split())
+
+
+def _names(tokens: list[Token]) -> list[str]:
+    return [n.strip() for n in _text(tokens).split(",") if n.strip()]
+
+
+def _references(tokens: list[Token], frame: _Frame, within: str | None, index: Index) -> None:
+    sig = [t for t in tokens if t.kind != lexer.WS]
+    for i, tok in enumerate(sig):
+        if tok.kind == lexer.FUNCTION and tok.text.lower() == "var(" and i + 1 < len(sig):
+            name = sig[i + 1]
+            if name.kind == lexer.IDENT and name.text.startswith("--"):
+                fallback = i + 2 < len(sig) and sig[i + 2].kind == lexer.COMMA
+                index.references.setdefault(name.text, []).append(
+                    Site(name.line, frame.layer, frame.selector, within, fallback))
+
+
+def _statement(head: list[Token], end: str | None, stack: list[_Frame], index: Index) -> None:
+    sig = [t for t in head if t.kind != lexer.WS]
+    frame = stack[-1]
+    if end == lexer.LBRACE:
+        if sig and sig[0].kind == lexer.AT:
+            name = sig[0].text[1:].lower()
+            if name == "layer":
+                names = _names(head[head.index(sig[0]) + 1:])
+                layer = ".".join(filter(None, [frame.layer, *names[:1]])) or None
+                if layer:
+                    index.layers.setdefault(layer, []).append(sig[0].line)
+                stack.append(_Frame("layer", layer, frame.selector))
+            elif name == "property" and len(sig) > 1:
+                stack.append(_Frame("property", frame.layer, name=sig[1].text, line=sig[0].line))
+            else:
+                stack.append(_Frame("at", frame.layer, frame.selector))
+        else:
+            stack.append(_Frame("rule", frame.layer, _text(head)))
+        return
+    if not sig:
+        return
+    if sig[0].kind == lexer.AT:
+        if sig[0].text.lower() == "@layer":
+            names = _names(head[head.index(sig[0]) + 1:])
+            prefix = f"{frame.layer}." if frame.layer else ""
+            index.orders.append((sig[0].line, [prefix + n for n in names]))
+        return
+    if sig[0].kind != lexer.IDENT or len(sig) < 2 or sig[1].kind != lexer.COLON:
+        return
+    name = sig[0].text
+    if frame.kind == "property":
+        frame.descriptors[name.lower()] = _text(head[head.index(sig[1]) + 1:])
+        return
+    if name.startswith("--"):
+        index.declarations.setdefault(name, []).append(Site(sig[0].line, frame.layer, frame.selector))
+    _references(head, frame, name, index)
+
+
+def _close(stack: list[_Frame], index: Index) -> None:
+    if len(stack) == 1:
+        return  # stray "}" at top level
+    frame = stack.pop()
+    if frame.kind == "property":
+        d = frame.descriptors
+        index.properties.setdefault(frame.name, []).append(Registration(
+            frame.name, frame.line, d.get("syntax"), d.get("inherits"), d.get("initial-value")))
+
+
+def index(source: str | Iterable[Token]) -> Index:
+    """Symbol tables of ``source`` (CSS text or tokens), built in one pass."""
+    tokens = tokenize(source) if isinstance(source, str) else source
+    idx = Index()
+    stack = [_Frame("root", None)]
+    head: list[Token] = []
+    depth = 0
+    for tok in tokens:
+        kind = tok.kind
+        if kind == lexer.COMMENT:
+            continue
+        if kind in _OPEN:
+            depth += 1
+        elif kind in _CLOSE:
+            depth = max(depth - 1, 0)
+        elif depth == 0 and kind in (lexer.SEMICOLON, lexer.LBRACE, lexer.RBRACE):
+            _statement(head, kind, stack, idx)
+            if kind == lexer.RBRACE:
+                _close(stack, idx)
+            head = []
+            continue
+        head.append(tok)
+    _statement(head, None, stack, idx)
+    return idx
+
+
+def _defined(idx: Index, name: str) -> bool:
+    return name in idx.declarations or any(r.initial is not None for r in idx.properties.get(name, ()))
+
+
+def _check_order(idx: Index) -> list[Issue]:
+    issues = []
+    position: dict[str, int] = {}
+    for line, names in idx.orders:
+        last = None
+        for name in names:
+            if name not in position:
+                position[name] = len(position)
+            elif last is not None and position[name] < position[last]:
+                issues.append(Issue(ERROR, "order-conflict",
+                                    f"@layer lists {name} after {last}, but they were declared the other way round",
+                                    line))
+            last = name
+    return issues
+
+
+def _check_layers(idx: Index) -> list[Issue]:
+    order = set(idx.order)
+    issues = []
+    for layer, lines in idx.layers.items():
+        if layer not in order and not any(o.startswith(layer + ".") for o in order):
+            issues.append(Issue(WARNING, "undeclared-layer",
+                                f"@layer {layer} is not in the order statement and sorts after every declared layer",
+                                lines[0]))
+    return issues
+
+
+def _check_properties(idx: Index) -> list[Issue]:
+    issues = []
+    for name, regs in idx.properties.items():
+        for reg in regs:
+            missing = [d for d, v in (("syntax", reg.syntax), ("inherits", reg.inherits)) if v is None]
+            if reg.initial is None and reg.syntax is not None and reg.syntax.strip("\"'") != "*":
+                missing.append("initial-value")
+            if missing:
+                issues.append(Issue(ERROR, "property-invalid",
+                                    f"@property {name} has no {', '.join(missing)} and is ignored", reg.line))
+        first = regs[0]
+        for reg in regs[1:]:
+            if (reg.syntax, reg.inherits, reg.initial) != (first.syntax, first.inherits, first.initial):
+                issues.append(Issue(WARNING, "property-conflict",
+                                    f"@property {name} is registered again with different descriptors "
+                                    f"(first at line {first.line})", reg.line))
+    return issues
+
+
+def _check_references(idx: Index) -> list[Issue]:
+    issues = []
+    for name, sites in idx.references.items():
+        if _defined(idx, name):
+            continue
+        for site in sites:
+            if not site.fallback:
+                issues.append(Issue(ERROR, "undefined-var",
+                                    f"var({name}) has no fallback and {name} is never declared", site.line))
+    return issues
+
+
+CHECKS = (_check_order, _check_layers, _check_properties, _check_references)
+
+
+def lint(idx: Index) -> list[Issue]:
+    """Every issue in ``idx``, errors first, then by line."""
+    issues = [issue for check in CHECKS for issue in check(idx)]
+    return sorted(issues, key=lambda i: (SEVERITIES.index(i.severity), i.line))
+
+
+def unreferenced(idx: Index) -> list[str]:
+    """Custom properties that are declared but never read."""
+    return sorted(n for n in idx.declarations if n not in idx.references)
+
+
+def _names_line(label: str, names: list[str]) -> str:
+    return f"  {label}: {', '.join(names) if names else 'none'}"
+
+
+def report(idx: Index, issues: list[Issue]) -> str:
+    registered = sorted(idx.properties)
+    lines = ["@PROPERTIES", f"  registered: {len(registered)}",
+             _names_line("unreferenced", [n for n in registered if n not in idx.references]),
+             "", "LAYERS"]
+    for i, layer in enumerate(idx.order, 1):
+        mark = "✓" if layer in idx.layers else "✗"
+        lines.append(f"   {i:>2}. {layer:28} {mark}")
+    lines += ["", "VARIABLES",
+              f"  declared: {len(idx.declarations)}  referenced: {len(idx.references)}",
+              _names_line("unreferenced", unreferenced(idx)), "", "ISSUES"]
+    lines += [f"  {i.line:>5}  {i.severity:7} {i.code:18} {i.message}" for i in issues] or ["  none"]
+    return "\n".join(lines)
+
+
+def as_json(idx: Index, issues: list[Issue]) -> dict:
+    return {
+        "properties": sorted(idx.properties),
+        "layers": [{"name": n, "blocks": len(idx.layers.get(n, ()))} for n in idx.order],
+        "variables": {
+            "declared": sorted(idx.declarations),
+            "referenced": sorted(idx.references),
+            "unreferenced": unreferenced(idx),
+        },
+        "issues": [{"severity": i.severity, "code": i.code, "message": i.message, "line": i.line}
+                   for i in issues],
+    }
+
+
+def lint_file(path: str | Path) -> tuple[Index, list[Issue]]:
+    idx = index(Path(path).read_text(encoding="utf-8"))
+    return idx, lint(idx)
@@ -0,0 +1,264 @@
+"""Production minifier over the parse tree.
+
+Beyond dropping comments and whitespace it:
+
+- shortens numbers (``0.50`` → ``.5``) and drops length units on zero where
+  that is provably equivalent — never inside functions, custom properties
+  or ``@property`` descriptors, where ``0px`` and ``0`` differ, and never in
+  ``unicode-range``, whose code points only lex like numbers;
+- merges a later rule into an earlier one with the same selector in the
+  same block (so the same layer), when nothing in between touches the
+  properties being moved — logical properties count as touching their
+  physical counterparts (``inline-size``/``width``, ``inset-inline``/``left``);
+- joins adjacent rules with identical bodies into one selector list, when
+  both selectors only use syntax every target browser parses (an unknown
+  selector in a list drops the whole rule).
+
+It never moves anything across an ``@layer`` or conditional block, so
+layer order and nesting semantics are exactly those of the input. Theme
+copies that differ in their conditions (``[data-ui-theme="light"]`` vs the
+``prefers-color-scheme`` blocks) stay separate: collapsing them would
+change which elements match under which media.
+"""
+
+import re
+
+from . import lexer
+from .lexer import tokenize
+from .parse import AtRule, Decl, Node, Rule, parse
+
+_LENGTH_UNITS = frozenset(
+    "px em rem ex ch vw vh vi vb vmin vmax svh svw dvh dvw lvh lvw cqi cqb cqw cqh "
+    "in cm mm pt pc q".split()
+)
+_NUMBER = re.compile(r"^([+-]?)(\d*)(?:\.(\d+))?((?:[eE][+-]?\d+)?)(.*)$", re.S)
+
+# Punctuation that never needs surrounding whitespace.
+_TIGHT = {lexer.COMMA, lexer.SEMICOLON, lexer.LBRACE, lexer.RBRACE}
+_TIGHT_SELECTOR_DELIMS = {">", "+", "~"}
+_TIGHT_VALUE_DELIMS = {"/", "*", ":"}
+_TIGHT_QUERY_DELIMS = {"<", ">", "=", ":"}
+_MERGEABLE_PSEUDOS = {"where", "is", "not", "root", "has", "first-child",
+                      "last-child", "only-child", "nth-child", "disabled"}
+
+# Values that only lex like numbers: "U+0000-00FF" must keep every digit.
+_OPAQUE = frozenset({"unicode-range"})
+
+# Properties that overlap without sharing a name prefix, and the family they
+# join besides their own: logical and physical spellings, aliases (word-wrap
+# is overflow-wrap) and shorthands (columns, white-space over text-wrap-*).
+_GROUPS = {
+    **{f"{bound}{axis}": "size" for bound in ("", "min-", "max-")
+       for axis in ("width", "height", "inline-size", "block-size")},
+    **{side: "inset" for side in ("top", "right", "bottom", "left")},
+    "word-wrap": "overflow",
+    "columns": "column",
+    **{name: "white" for name in ("text-wrap", "text-wrap-mode", "text-wrap-style")},
+}
+
+# Shorthands that reset properties outside their own name prefix.
+_RESETS = {
+    "font": {"line-height"},
+    "inset": {"top", "right", "bottom", "left"},
+    "place-items": {"align-items", "justify-items"},
+    "place-content": {"align-content", "justify-content"},
+    "place-self": {"align-self", "justify-self"},
+    "gap": {"row-gap", "column-gap"},
+}
+
+
+def number(text: str) -> str:
+    """Shortest spelling of a NUMBER/PERCENTAGE/DIMENSION token."""
+    m = _NUMBER.match(text)
+    if not m:
+        return text
+    sign, whole, frac, exp, unit = m.groups()
+    whole = whole.lstrip("0")
+    frac = (frac or "").rstrip("0")
+    if not whole and not frac:
+        return f"0{unit}"
+    body = f"{whole}.{frac}" if frac else whole
+    return f"{sign}{body}{exp}{unit}"
+
+
+def _is_zero_length(text: str) -> bool:
+    m = _NUMBER.match(text)
+    return bool(m and m.group(5).lower() in _LENGTH_UNITS
+                and not m.group(2).strip("0") and not (m.group(3) or "").strip("0"))
+
+
+def compact(text: str, mode: str = "value", strip_zero_units: bool = False, shorten: bool = True) -> str:
+    """Minify a prelude or value. ``mode`` is ``"selector"``, ``"query"`` or ``"value"``;
+    ``shorten=False`` leaves numbers as written."""
+    tight = {"selector": _TIGHT_SELECTOR_DELIMS,
+             "query": _TIGHT_QUERY_DELIMS,
+             "value": _TIGHT_VALUE_DELIMS}[mode]
+    out: list[lexer.Token] = []
+    space = False
+    depth = 0
+    for tok in tokenize(text):
+        kind = tok.kind
+        if kind == lexer.WS:
+            space = bool(out)
+            continue
+        if shorten and kind in (lexer.NUMBER, lexer.PERCENTAGE, lexer.DIMENSION):
+            txt = number(tok.text)
+            if strip_zero_units and depth == 0 and _is_zero_length(txt):
+                txt = "0"
+            tok = tok._replace(text=txt)
+        if space and out and not (_loose(out[-1], tight) or _loose(tok, tight)
+                                  or out[-1].kind in (lexer.FUNCTION, lexer.LPAREN, lexer.LBRACKET)
+                                  or kind in (lexer.RPAREN, lexer.RBRACKET)):
+            out.append(lexer.Token(lexer.WS, " ", 0))
+        if kind in (lexer.FUNCTION, lexer.LPAREN):
+            depth += 1
+        elif kind == lexer.RPAREN:
+            depth -= 1
+        out.append(tok)
+        space = False
+    return "".join(t.text for t in out)
+
+
+def _loose(tok: lexer.Token, tight: set[str]) -> bool:
+    # In selectors a space before ":" is a descendant combinator, so the
+    # colon is only tight in values and queries (where it is in ``tight``).
+    return tok.kind in _TIGHT or (tok.kind in (lexer.DELIM, lexer.COLON) and tok.text in tight)
+
+
+def _prop_names(node: Node) -> set[str]:
+    if isinstance(node, Decl):
+        return {node.name}
+    names = set()
+    for child in node.children or ():
+        names |= _prop_names(child)
+    return names
+
+
+def _groups(name: str) -> set[str]:
+    # inset-inline-start groups with left through its "inset" prefix.
+    return {name.split("-")[0], *filter(None, [_GROUPS.get(name)])}
+
+
+def _conflicts(a: set[str], b: set[str]) -> bool:
+    if "all" in a or "all" in b:
+        return bool(a and b)
+    for x in a:
+        for y in b:
+            if x == y:
+                return True
+            if x.startswith("--") or y.startswith("--"):
+                continue
+            if _groups(x) & _groups(y) or y in _RESETS.get(x, ()) or x in _RESETS.get(y, ()):
+                return True
+    return False
+
+
+def _flat(rule: Rule) -> bool:
+    return all(isinstance(c, Decl) for c in rule.children)
+
+
+def _merge_same_selector(children: list[Node]) -> list[Node]:
+    out: list[Node] = []
+    for node in children:
+        if isinstance(node, Rule) and _flat(node):
+            moving = _prop_names(node)
+            for i in range(len(out) - 1, -1, -1):
+                prev = out[i]
+                if isinstance(prev, Rule) and prev.prelude == node.prelude and _flat(prev):
+                    prev.children.extend(node.children)
+                    node = None
+                    break
+                if _conflicts(moving, _prop_names(prev)):
+                    break
+            if node is None:
+                continue
+        out.append(node)
+    return out
+
+
+def _safe_selector(selector: str) -> bool:
+    if "::" in selector or "-webkit-" in selector or "-moz-" in selector:
+        return False
+    return all(p in _MERGEABLE_PSEUDOS
+               for p in re.findall(r":([\w-]+)", re.sub(r"\[[^\]]*\]", "", selector)))
+
+
+def _body(rule: Rule) -> tuple:
+    return tuple((d.name, d.value, d.important) for d in rule.children)
+
+
+def _merge_same_body(children: list[Node]) -> list[Node]:
+    out: list[Node] = []
+    for node in children:
+        prev = out[-1] if out else None
+        if (isinstance(node, Rule) and isinstance(prev, Rule) and _flat(node) and _flat(prev)
+                and node.children and _body(node) == _body(prev)
+                and _safe_selector(node.prelude) and _safe_selector(prev.prelude)):
+            prev.prelude = f"{prev.prelude},{node.prelude}"
+            continue
+        out.append(node)
+    return out
+
+
+def optimize(children: list[Node], in_property: bool = False) -> list[Node]:
+    """Apply the structural passes bottom-up and drop empty style rules, in place of ``children``."""
+    kept = []
+    for node in children:
+        if isinstance(node, Decl):
+            # "flex: 1 0px" and "flex: 1 0" mean different things.
+            keep_units = in_property or node.name.startswith("--") or node.name == "flex"
+            node.value = compact(node.value, "value", strip_zero_units=not keep_units,
+                                 shorten=node.name not in _OPAQUE)
+        elif isinstance(node, Rule):
+            node.prelude = compact(node.prelude, "selector")
+            node.children = optimize(node.children)
+            if not node.children:
+                continue
+        else:
+            node.prelude = compact(node.prelude, "query" if node.name in ("media", "container") else "value")
+            if node.children is not None:
+                node.children = optimize(node.children, in_property=node.name == "property")
+        kept.append(node)
+    return _merge_same_body(_merge_same_selector(kept))
+
+
+def emit(nodes: list[Node]) -> str:
+    parts = []
+    for node in nodes:
+        if isinstance(node, Decl):
+            value = node.value or " "
+            parts.append(f"{node.name}:{value}{'!important' if node.important else ''}")
+            continue
+        head = node.prelude if isinstance(node, Rule) else (
+            f"@{node.name} {node.prelude}" if node.prelude else f"@{node.name}")
+        if node.children is None:
+            parts.append(head)
+        else:
+            parts.append(f"{head}{{{emit(node.children)}}}")
+    out = []
+    for node, text in zip(nodes, parts):
+        out.append(text)
+        if isinstance(node, Decl) or node.children is None:
+            out.append(";")
+    # The last declaration/statement in a block needs no semicolon.
+    if out and out[-1] == ";":
+        out.pop()
+    return "".join(out)
+
+
+def minify(css: str) -> str:
+    """Minified ``css``. Same-selector rules never merge across a rule that sets an
+    overlapping property:
+
+    >>> minify(".x{color:red}.y{word-wrap:normal}.x{overflow-wrap:anywhere}")
+    '.x{color:red}.y{word-wrap:normal}.x{overflow-wrap:anywhere}'
+    >>> minify(".x{color:red}.y{column-count:2}.x{columns:3}")
+    '.x{color:red}.y{column-count:2}.x{columns:3}'
+    >>> minify(".x{color:red}.y{white-space:pre}.x{text-wrap-mode:nowrap}")
+    '.x{color:red}.y{white-space:pre}.x{text-wrap-mode:nowrap}'
+    >>> minify(".x{color:red}.y{inline-size:1px}.x{width:2px}")
+    '.x{color:red}.y{inline-size:1px}.x{width:2px}'
+    >>> minify(".x{color:red}.y{width:2px}.x{margin:0}")
+    '.x{color:red;margin:0}.y{width:2px}'
+    """
+    return emit(optimize(list(parse(css))))
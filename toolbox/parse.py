@@ -0,0 +1,196 @@
+"""Compact CSS tree for the toolbox dialect.
+
+Three node classes, all ``__slots__``:
+
+- ``AtRule``: ``@layer``, ``@property``, ``@media``, ``@container``,
+  ``@starting-style``, ``@page``… ``children`` is ``None`` for statements
+  (``@layer a, b;``) and a list for blocks.
+- ``Rule``: a style rule. Nested rules (``&:has(> svg)``) and nested
+  at-rules sit in ``children`` next to its declarations, in source order.
+- ``Decl``: ``name: value`` with ``!important`` split off.
+
+Preludes and values are stored as single strings with whitespace runs
+collapsed and comments dropped; the grammar inside them (selectors, media
+ranges, ``oklch(from …)``) is left to the tools that care. ``parse`` yields
+top-level nodes as soon as each one closes, so memory is bounded by the
+largest top-level block rather than the file.
+"""
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from . import lexer
+from .lexer import Token, tokenize, tokenize_file
+
+_OPEN = {lexer.LPAREN, lexer.LBRACKET, lexer.FUNCTION}
+_CLOSE = {lexer.RPAREN, lexer.RBRACKET}
+
+
+class Decl:
+    __slots__ = ("name", "value", "important", "line")
+
+    def __init__(self, name: str, value: str, important: bool = False, line: int = 0):
+        self.name = name
+        self.value = value
+        self.important = important
+        self.line = line
+
+    def __repr__(self):
+        bang = " !important" if self.important else ""
+        return f"Decl({self.name}: {self.value}{bang})"
+
+
+class Rule:
+    __slots__ = ("prelude", "children", "line")
+
+    def __init__(self, prelude: str, children: list | None = None, line: int = 0):
+        self.prelude = prelude
+        self.children = [] if children is None else children
+        self.line = line
+
+    def __repr__(self):
+        return f"Rule({self.prelude!r}, {len(self.children)} children)"
+
+
+class AtRule:
+    __slots__ = ("name", "prelude", "children", "line")
+
+    def __init__(self, name: str, prelude: str = "", children: list | None = None, line: int = 0):
+        self.name = name
+        self.prelude = prelude
+        self.children = children
+        self.line = line
+
+    def __repr__(self):
+        body = "" if self.children is None else f", {len(self.children)} children"
+        return f"AtRule(@{self.name} {self.prelude!r}{body})"
+
+
+Node = Decl | Rule | AtRule
+
+
+def _text(tokens: list[Token]) -> str:
+    parts = []
+    for t in tokens:
+        if t.kind != lexer.WS:
+            parts.append(t.text)
+        elif parts and parts[-1] != " ":
+            parts.append(" ")
+    return "".join(parts).strip()
+
+
+def _significant(tokens: Iterator[Token]) -> Iterator[Token]:
+    return (t for t in tokens if t.kind != lexer.COMMENT)
+
+
+def _item(tokens: Iterator[Token]) -> tuple[list[Token], str | None]:
+    """Collect tokens up to a top-level ``;``, ``{`` or ``}``; return them and the terminator."""
+    out, depth = [], 0
+    for t in tokens:
+        kind = t.kind
+        if kind in _OPEN:
+            depth += 1
+        elif kind in _CLOSE:
+            depth = max(depth - 1, 0)
+        elif depth == 0 and kind in (lexer.SEMICOLON, lexer.LBRACE, lexer.RBRACE):
+            return out, kind
+        out.append(t)
+    return out, None
+
+
+def _node(head: list[Token], end: str | None, tokens: Iterator[Token]) -> Node | None:
+    first = next((t for t in head if t.kind != lexer.WS), None)
+    if first is None:
+        return None if end != lexer.LBRACE else Rule("", _block(tokens), 0)
+    if end == lexer.LBRACE:
+        if first.kind == lexer.AT:
+            prelude = head[head.index(first) + 1:]
+            return AtRule(first.text[1:], _text(prelude), _block(tokens), first.line)
+        return Rule(_text(head), _block(tokens), first.line)
+    if first.kind == lexer.AT:
+        return AtRule(first.text[1:], _text(head[head.index(first) + 1:]), None, first.line)
+    return _decl(head, first)
+
+
+def _decl(head: list[Token], first: Token) -> Decl | None:
+    colon = next((i for i, t in enumerate(head) if t.kind == lexer.COLON), None)
+    if colon is None or first.kind != lexer.IDENT:
+        return None
+    value = head[colon + 1:]
+    important = False
+    sig = [i for i, t in enumerate(value) if t.kind != lexer.WS]
+    if (len(sig) >= 2 and value[sig[-1]].kind == lexer.IDENT
+            and value[sig[-1]].text.lower() == "important"
+            and value[sig[-2]].text == "!"):
+        important = True
+        value = value[:sig[-2]]
+    return Decl(first.text, _text(value), important, first.line)
+
+
+def _block(tokens: Iterator[Token]) -> list[Node]:
+    children = []
+    while True:
+        head, end = _item(tokens)
+        node = _node(head, end, tokens)
+        if node is not None:
+            children.append(node)
+        if end in (lexer.RBRACE, None):
+            return children
+
+
+def parse(source: str | Iterable[Token]) -> Iterator[Node]:
+    """Yield top-level nodes of ``source``: CSS text or a token stream.
+
+    For chunked input pass ``tokenize(chunks)``.
+    """
+    tokens = _significant(tokenize(source) if isinstance(source, str) else iter(source))
+    while True:
+        head, end = _item(tokens)
+        if end == lexer.RBRACE:
+            continue  # stray close brace at top level: skip it, as browsers do
+        node = _node(head, end, tokens)
+        if node is not None:
+            yield node
+        if end is None:
+            return
+
+
+def parse_file(path: str | Path) -> Iterator[Node]:
+    return parse(tokenize_file(path))
+
+
+def walk(nodes: Iterable[Node], ancestors: tuple = ()) -> Iterator[tuple[Node, tuple]]:
+    """Depth-first ``(node, ancestors)`` pairs, parents before children."""
+    for node in nodes:
+        yield node, ancestors
+        children = getattr(node, "children", None)
+        if children:
+            yield from walk(children, ancestors + (node,))
+
+
+def layer_of(ancestors: tuple) -> str | None:
+    """Dotted layer name of the innermost enclosing ``@layer`` blocks, or ``None`` if unlayered."""
+    names = [a.prelude for a in ancestors if isinstance(a, AtRule) and a.name == "layer"]
+    return ".".join(names) if names else None
+
+
+def layer_names(statement: AtRule) -> list[str]:
+    """Names listed by an ``@layer a, b.c;`` statement (or the single name of a block)."""
+    return [n.strip() for n in statement.prelude.split(",") if n.strip()]
+
+
+def serialize(nodes: Iterable[Node], indent: str = "    ", _depth: int = 0) -> str:
+    """Pretty-print nodes back to CSS, one declaration per line."""
+    pad = indent * _depth
+    out = []
+    for node in nodes:
+        if isinstance(node, Decl):
+            bang = " !important" if node.important else ""
+            out.append(f"{pad}{node.name}: {node.value}{bang};\n")
+            continue
+        head = f"@{node.name} {node.prelude}".rstrip() if isinstance(node, AtRule) else node.prelude
+        if node.children is None:
+            out.append(f"{pad}{head};\n")
+        else:
+            out.append(f"{pad}{head} {{\n{serialize(node.children, indent, _depth + 1)}{pad}}}\n")
+    return "".join(out)
@@ -0,0 +1,197 @@
+"""Compile the palette presets of the colour tour page.
+
+``docs/presets.json`` holds each preset: its name, tag and blurb and the
+``--cfg-color-*`` values (plus ``--hue`` and the page's ``--cfg-fg-tint``)
+that give it its character. ``compile_all`` turns every preset, on a
+process pool, into
+
+- a theme block, ``[data-ui-preset="<id>"] { … }``, that applies it to any
+  subtree — ``theme_css`` wraps them in ``@layer theme`` for use as real
+  themes;
+- a swatch table: the colours of the page's strips (the ``--bg`` ramp at
+  the preset hue, the accents at ``--bg: 0.55`` across hues and the
+  surfaces at depth 1–4 in light and dark), resolved with ``toolbox/color.py``.
+
+``render_page`` writes both into ``docs/generic_pallets.html`` between its
+``presets:css`` and ``presets:cards`` markers: the blocks into the page's
+``<style>``, and one static card per preset with the swatches inline, so
+the page no longer builds its cards in script.
+"""
+
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from html import escape
+from pathlib import Path
+
+import numpy as np
+
+from .color import DARK, LIGHT, Config, Oklch, resolve
+from .parse import AtRule, Decl, Node, Rule, serialize
+
+PRESETS = "docs/presets.json"
+PAGE = "docs/generic_pallets.html"
+RAMP = (0, 0.08, 0.15, 0.25, 0.4, 0.55, 0.75, 1)
+ACCENTS = (25, 60, 90, 145, 200, 240, 290, 330)
+ACCENT_BG = 0.55
+DEPTHS = (1, 2, 3, 4)
+LABELS = {
+    "--cfg-color-muted-l": "muted L",
+    "--cfg-color-muted-c": "muted C",
+    "--cfg-color-vivid-l": "vivid L",
+    "--cfg-color-vivid-c": "vivid C",
+    "--cfg-color-surf-chroma": "surf C",
+    "--cfg-fg-tint": "fg tint",
+    "--hue": "hue",
+}
+
+
+@dataclass(frozen=True)
+class Preset:
+    id: str
+    name: str
+    tag: str
+    blurb: str
+    config: dict[str, str | float]
+    note: str = ""
+
+    def color_config(self, base: Config = LIGHT) -> Config:
+        """``base`` with the preset's values; its ``--hue`` becomes the base hue."""
+        cfg = Config.from_css({k: str(v) for k, v in self.config.items()}, base)
+        hue = self.config.get("--hue")
+        return cfg if hue is None else replace(cfg, hue=float(hue))
+
+
+@dataclass
+class Compiled:
+    preset: Preset
+    theme: Rule
+    swatches: dict
+
+
+def load(path: str | Path = PRESETS) -> list[Preset]:
+    return [Preset(**p) for p in json.loads(Path(path).read_text(encoding="utf-8"))]
+
+
+def _css(color: Oklch) -> list[str]:
+    fields = np.broadcast_arrays(*(np.asarray(f, dtype=float) for f in color))
+    return [Oklch(*values).css() for values in zip(*(f.ravel() for f in fields))]
+
+
+def swatches(preset: Preset) -> dict:
+    """The colours of the preset's ramp, accent and (per theme) depth strips."""
+    light = preset.color_config(LIGHT)
+    return {
+        "ramp": _css(resolve(light, bg=np.array(RAMP)).bg),
+        "accents": _css(resolve(light, bg=ACCENT_BG, hue=np.array(ACCENTS, dtype=float)).bg),
+        "depths": {name: _css(resolve(preset.color_config(base), depth=np.array(DEPTHS, dtype=float)).bg)
+                   for name, base in (("light", LIGHT), ("dark", DARK))},
+    }
+
+
+def theme_block(preset: Preset) -> Rule:
+    return Rule(f'[data-ui-preset="{preset.id}"]', [Decl(k, str(v)) for k, v in preset.config.items()])
+
+
+def _compile(preset: Preset) -> Compiled:
+    return Compiled(preset, theme_block(preset), swatches(preset))
+
+
+def compile_all(presets: list[Preset], jobs: int | None = None) -> list[Compiled]:
+    """Compile ``presets`` on a process pool, in order."""
+    if jobs == 1:
+        return [_compile(p) for p in presets]
+    with ProcessPoolExecutor(jobs) as pool:
+        return list(pool.map(_compile, presets))
+
+
+def theme_css(compiled: list[Compiled]) -> list[Node]:
+    return [AtRule("layer", "theme", [c.theme for c in compiled])]
+
+
+def swatch_json(compiled: list[Compiled]) -> dict:
+    return {c.preset.id: c.swatches for c in compiled}
+
+
+def _strip(cls: str, cells: list[str]) -> str:
+    return "\n".join([f'    <div class="{cls}">', *cells, "    </div>"])
+
+
+def card(c: Compiled) -> str:
+    """The static markup of one preset's card."""
+    p, s = c.preset, c.swatches
+    readout = "".join(f'<div class="row"><span class="name">{LABELS.get(k, k)}</span>'
+                      f'<span class="val">{v}</span></div>' for k, v in p.config.items())
+    ramp = [f'      <div style="--bg: {bg:g}; --swatch: {color}"></div>' for bg, color in zip(RAMP, s["ramp"])]
+    accents = [f'      <div style="--bg: {ACCENT_BG:g}; --hue-lock: {hue}; --swatch: {color}"></div>'
+               for hue, color in zip(ACCENTS, s["accents"])]
+    depths = [f'      <div class="surface" style="--depth: {d}; --swatch-light: {light}; --swatch-dark: {dark}"></div>'
+              for d, light, dark in zip(DEPTHS, s["depths"]["light"], s["depths"]["dark"])]
+    return SHOWCASE.format(
+        id=p.id, name=escape(p.name), tag=escape(p.tag), blurb=escape(p.blurb, quote=False), readout=readout,
+        depths=_strip("depth-row", depths), ramp=_strip("swatch-row", ramp), accents=_strip("accent-row", accents))
+
+
+def _region(text: str, name: str, body: str) -> str:
+    pattern = re.compile(rf"(presets:{name}\b[^\n]*\n)(?:.*?\n)??([^\n]*/presets:{name}\b)", re.S)
+    if not pattern.search(text):
+        raise ValueError(f"no presets:{name} … /presets:{name} markers")
+    return pattern.sub(lambda m: m.group(1) + body + "\n" + m.group(2), text, count=1)
+
+
+def render_page(html: str, compiled: list[Compiled]) -> str:
+    """``html`` with its generated regions rewritten from ``compiled``."""
+    html = _region(html, "css", serialize([c.theme for c in compiled], indent="  ").rstrip("\n"))
+    return _region(html, "cards", "\n".join(card(c) for c in compiled))
+
+
+SHOWCASE = """\
+<article class="preset-card surface" data-ui-preset="{id}">
+  <div class="preset-header">
+    <span class="name">{name}</span>
+    <span class="tag surface">{tag}</span>
+  </div>
+  <p class="preset-blurb">{blurb}</p>
+  <div class="preset-config surface">{readout}</div>
+  <div class="showcase surface">
+    <div class="navbar surface">
+      <span class="brand">acme.co</span>
+      <span class="links"><span>home</span><span>docs</span><span>pricing</span></span>
+      <span class="avatar"></span>
+    </div>
+    <div class="content-card surface">
+      <h4>Quarterly results</h4>
+      <p class="body">Revenue beat expectations on solid customer growth and improving margins.</p>
+      <div class="meta">
+        <span>jan 24</span>
+        <span>·</span>
+        <span>4 min read</span>
+      </div>
+      <svg class="sparkline" viewBox="0 0 200 36" preserveAspectRatio="none">
+        <defs>
+          <linearGradient class="spark-grad" x1="0" y1="0" x2="0" y2="1">
+            <stop offset="0" stop-color="currentColor" style="--fg: 0.55"/>
+            <stop offset="1" stop-color="currentColor" stop-opacity="0"/>
+          </linearGradient>
+        </defs>
+        <path class="area" d="" vector-effect="non-scaling-stroke"/>
+        <path class="line" d="" fill="none" stroke="currentColor" vector-effect="non-scaling-stroke"/>
+        <circle class="endpoint" cx="0" cy="0" fill="currentColor"/>
+      </svg>
+    </div>
+    <div class="button-row">
+      <button class="primary">Continue</button>
+      <button class="secondary">Cancel</button>
+      <span class="badge success">live</span>
+      <span class="badge warn">draft</span>
+      <span class="badge danger">err</span>
+    </div>
+    <span class="swatch-label">surface palette · --depth 1 → 4 (auto-computed in real use)</span>
+{depths}
+    <span class="swatch-label">chromatic ramp · --bg at preset hue</span>
+{ramp}
+    <span class="swatch-label">accent palette · --bg: 0.55 across hues</span>
+{accents}
+  </div>
+</article>"""
@@ -0,0 +1,150 @@
+"""Drop rules no page can match.
+
+Only ``layout.*``, ``component.*`` and ``utility.*`` are purged; ``reset``,
+``core``, ``theme`` and anything unlayered (``@property`` registrations,
+``:root`` defaults) always ship.
+
+A selector is kept unless it provably cannot match: it requires a class,
+id or ``data-ui-*`` attribute value that no scanned page uses. The check is
+deliberately one-sided — ``:where()``/``:is()`` lists match if any branch
+could, and anything inside ``:not()``, ``:has()`` or other functional
+pseudo-classes is ignored.
+"""
+
+from collections.abc import Callable, Iterable
+
+from . import lexer
+from .lexer import tokenize
+from .parse import AtRule, Decl, Node, Rule, layer_of, parse
+from .usage import Usage
+
+PURGEABLE = ("layout.", "component.", "utility.")
+_CONDITIONAL = {"media", "container", "supports", "starting-style"}
+_ALTERNATIVES = {"where(", "is(", "matches(", "-webkit-any("}
+
+
+def split_list(selector: str) -> list[str]:
+    """Split a selector list on its top-level commas."""
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(selector):
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(selector[start:i].strip())
+            start = i + 1
+    parts.append(selector[start:].strip())
+    return [p for p in parts if p]
+
+
+def _group(tokens: list[lexer.Token], i: int) -> tuple[str, int]:
+    """Text inside the function opened at ``tokens[i]`` and the index after its ``)``."""
+    depth, j = 1, i + 1
+    while j < len(tokens) and depth:
+        kind = tokens[j].kind
+        if kind in (lexer.FUNCTION, lexer.LPAREN):
+            depth += 1
+        elif kind == lexer.RPAREN:
+            depth -= 1
+        j += 1
+    return "".join(t.text for t in tokens[i + 1:j - 1]), j
+
+
+def _attribute(tokens: list[lexer.Token], i: int) -> tuple[str, str | None, int]:
+    j = i + 1
+    while j < len(tokens) and tokens[j].kind != lexer.RBRACKET:
+        j += 1
+    inner = [t for t in tokens[i + 1:j] if t.kind != lexer.WS]
+    name = inner[0].text if inner else ""
+    value = None
+    if len(inner) >= 3 and inner[-2].text == "=" and inner[-3].text not in "~|^$*":
+        value = inner[-1].text.strip("\"'")
+    return name, value, j + 1
+
+
+def _type_position(tokens: list[lexer.Token], i: int) -> bool:
+    """Whether the IDENT at ``i`` is a type selector rather than a pseudo-class name."""
+    if i == 0:
+        return True
+    prev = tokens[i - 1]
+    return prev.kind in (lexer.WS, lexer.COMMA) or (prev.kind == lexer.DELIM and prev.text in ">+~")
+
+
+def could_match(selector: str, usage: Usage, tags: bool = False) -> bool:
+    """False only if ``selector`` requires something no page uses.
+
+    With ``tags`` type selectors must be used too; otherwise only classes,
+    ids and ``data-ui-*`` values are checked.
+    """
+    tokens = list(tokenize(selector))
+    i = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        if tags and tok.kind == lexer.IDENT and _type_position(tokens, i):
+            if tok.text.lower() not in usage.tags:
+                return False
+            i += 1
+        elif tok.kind == lexer.DELIM and tok.text == "." and i + 1 < len(tokens) \
+                and tokens[i + 1].kind == lexer.IDENT:
+            if tokens[i + 1].text not in usage.classes:
+                return False
+            i += 2
+        elif tok.kind == lexer.HASH:
+            if tok.text[1:] not in usage.ids:
+                return False
+            i += 1
+        elif tok.kind == lexer.LBRACKET:
+            name, value, i = _attribute(tokens, i)
+            if name.startswith("data-ui-") and not usage.has_attr(name, value):
+                return False
+        elif tok.kind == lexer.FUNCTION:
+            inner, i = _group(tokens, i)
+            if tok.text in _ALTERNATIVES and not any(could_match(s, usage, tags)
+                                                     for s in split_list(inner)):
+                return False
+        else:
+            i += 1
+    return True
+
+
+def purgeable(layer: str | None) -> bool:
+    return layer is not None and layer.startswith(PURGEABLE)
+
+
+def _purge(children: list[Node], usage: Usage, ancestors: tuple,
+           scope: Callable[[str | None], bool], tags: bool) -> list[Node]:
+    in_scope = scope(layer_of(ancestors))
+    kept = []
+    for node in children:
+        if isinstance(node, Decl):
+            kept.append(node)
+            continue
+        if isinstance(node, Rule) and in_scope:
+            alive = [s for s in split_list(node.prelude) if could_match(s, usage, tags)]
+            if not alive:
+                continue
+            node.prelude = ", ".join(alive)
+        if isinstance(node, AtRule) and node.name.endswith("keyframes"):
+            kept.append(node)  # "from"/"to"/"50%" are not element selectors
+            continue
+        if node.children is not None:
+            node.children = _purge(node.children, usage, ancestors + (node,), scope, tags)
+            if isinstance(node, AtRule) and node.name in _CONDITIONAL and not node.children:
+                continue
+        kept.append(node)
+    return kept
+
+
+def purge(nodes: Iterable[Node], usage: Usage,
+          scope: Callable[[str | None], bool] = purgeable, tags: bool = False) -> list[Node]:
+    """Return ``nodes`` without the rules ``usage`` cannot match.
+
+    ``scope`` decides from a rule's layer (``None`` when unlayered) whether it
+    may be dropped at all.
+    """
+    return _purge(list(nodes), usage, (), scope, tags)
+
+
+def purge_css(css: str, usage: Usage) -> list[Node]:
+    return purge(parse(css), usage)
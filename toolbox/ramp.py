@@ -0,0 +1,166 @@
+"""Solve the surface-ramp parameters of a theme from the steps it should have.
+
+The theme layer sets ``--cfg-color-top-l``, ``base-step``, ``curve-k``,
+``surf-mid`` and ``surf-rng`` by hand (88/4/0.6/60.5/55 light,
+33/2.5/0.6/33.5/27.5 dark). Given a top lightness and the step wanted
+between each pair of consecutive depths 0–4, ``solve`` finds the rest:
+
+- ``wcag`` steps are WCAG 2 contrast ratios between the surfaces (the hand
+  tuned light theme steps by about 1.15, dark by 1.09), ``l`` steps are
+  OKLCH lightness in percent. Steps are signed, so a solution that matches
+  them also makes ``--_surf-l`` fall monotonically with depth;
+- the ramp only depends on ``curve-k`` and ``surf-rng`` through
+  ``curve-k / surf-rng²``, so ``curve-k`` is held (0.6, as both themes
+  have it) and base-step, surf-mid and surf-rng are fitted by damped
+  Gauss-Newton in the least-squares sense;
+- every argument broadcasts, and the fit runs on all problems at once, so
+  one call solves a theme per brand hue (the hue moves luminance, and with
+  it the WCAG steps).
+"""
+
+from dataclasses import dataclass, fields, replace
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from .color import DARK, LIGHT, Config, resolve, surface_l
+from .contrast import wcag
+
+METRICS = ("wcag", "l")
+DEPTHS = np.arange(5.0)
+ITERATIONS = 80
+MAX_ERROR = 0.01
+
+
+@dataclass
+class Solution:
+    config: Config
+    hue: float
+    target: np.ndarray  # the steps asked for, depth d -> d + 1
+    steps: np.ndarray  # the steps the solution has
+    surf_l: np.ndarray  # --_surf-l at depth 0–4, percent
+
+    @property
+    def error(self) -> float:
+        """Largest relative deviation of a step from its target."""
+        return float(np.max(np.abs(self.steps / self.target - 1)))
+
+    @property
+    def monotone(self) -> bool:
+        return bool(np.all(np.diff(self.surf_l) < 0) and self.surf_l[-1] >= 4)
+
+    def problems(self, max_error: float = MAX_ERROR) -> list[str]:
+        """Why the solution is not the ramp asked for; empty when it is."""
+        out = [] if self.monotone else ["NOT MONOTONE"]
+        return out + ([f"OFF TARGET ({self.error:.1%})"] if not self.error <= max_error else [])
+
+    def css(self) -> dict[str, str]:
+        """The solved values as declarations, with the hue when one was given."""
+        values = self.config.css()
+        keys = ("top-l", "base-step", "curve-k", "surf-mid", "surf-rng") + (() if np.isnan(self.hue) else ("hue",))
+        return {f"--cfg-color-{k}": values[f"--cfg-color-{k}"] for k in keys}
+
+
+def steps(cfg: Config, metric: str = "wcag", hue: ArrayLike = np.nan) -> np.ndarray:
+    """``(..., 4)`` signed steps of ``--_bg`` from each depth to the next: positive
+    when the deeper surface is darker."""
+    bg = resolve(cfg, depth=DEPTHS, hue=np.asarray(hue, dtype=float)[..., None]).bg
+    l = np.broadcast_arrays(*bg[:3])[0]
+    if metric == "l":
+        return -np.diff(l, axis=-1) * 100
+    lin = np.clip(bg.linear_srgb(), 0, 1)
+    ratio = wcag(lin[..., :-1, :], lin[..., 1:, :])
+    return np.where(np.diff(l, axis=-1) < 0, ratio, 1 / ratio)
+
+
+def _transform(values: np.ndarray, metric: str) -> np.ndarray:
+    # Ratios compose multiplicatively; fit them in log space.
+    return np.log(values) if metric == "wcag" else values
+
+
+def _config(base: Config, top: np.ndarray, k: np.ndarray, x: np.ndarray) -> Config:
+    # x = (base-step, surf-mid, 1 / surf-rng): the inverse keeps the curve smooth down to a straight ramp.
+    inv = np.maximum(np.abs(x[:, 2:3]), 1e-4)
+    return replace(base, top_l=top[:, None], curve_k=k[:, None], base_step=x[:, 0:1], surf_mid=x[:, 1:2],
+                   surf_rng=1 / inv)
+
+
+def solve(top_l: ArrayLike, target: ArrayLike, *, metric: str = "wcag", hue: ArrayLike = np.nan,
+          curve_k: ArrayLike = 0.6, base: Config | None = None,
+          iterations: int = ITERATIONS) -> list[Solution]:
+    """Fit base-step, surf-mid and surf-rng for each (broadcast) ``top_l``, ``hue`` and
+    ``target`` — a step or ``(..., 4)`` steps from depth 0 to 4.
+
+    ``base`` supplies the other values (surface chroma, hue); by default the
+    light or dark theme, whichever ``top_l`` is on the side of (60, where the
+    formula flips ``--_dark``). Raises ``ValueError`` for a ``wcag`` step that
+    is not positive or an ``l`` step of zero.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"unknown metric {metric!r} (expected one of {', '.join(METRICS)})")
+    target = np.asarray(target, dtype=float)
+    target = target[..., None] if target.ndim == 0 or target.shape[-1] != 4 else target
+    # A contrast ratio is positive (below 1 when the deeper surface is lighter); a
+    # lightness step of 0 has no relative error to fit.
+    if not np.all(np.isfinite(target)) or np.any(target <= 0 if metric == "wcag" else target == 0):
+        raise ValueError(f"{metric} steps must be finite and {'positive' if metric == 'wcag' else 'nonzero'}")
+    top, hue, k = (np.asarray(a, dtype=float) for a in (top_l, hue, curve_k))
+    shape = np.broadcast_shapes(top.shape, hue.shape, k.shape, target.shape[:-1])
+    top, hue, k = (np.broadcast_to(a, shape).ravel() for a in (top, hue, k))
+    target = np.broadcast_to(target, (*shape, 4)).reshape(-1, 4)
+    bases = [base or (DARK if t < 60 else LIGHT) for t in top]
+    # Fields that differ per problem (surface chroma) become columns.
+    base = replace(LIGHT, surf_chroma=np.array([b.surf_chroma for b in bases])[:, None],
+                   hue=np.array([b.hue for b in bases], dtype=float)[:, None])
+    goal = _transform(target, metric)
+
+    def residual(x):
+        return _transform(steps(_config(base, top, k, x), metric, hue), metric) - goal
+
+    # Start from the hand-tuned light theme, scaled to the top lightness and target size.
+    x = np.stack([np.full(len(top), 4.0) * top / 88, top - 27.5 * top / 88, 88 / (55 * top)], axis=1)
+    if metric == "l":
+        x[:, 0] = target.mean(axis=1)
+    r = residual(x)
+    cost = (r * r).sum(axis=1)
+    damping = np.full(len(top), 1e-3)
+    eye = np.eye(3)
+    for _ in range(iterations):
+        h = np.maximum(np.abs(x) * 1e-6, 1e-9)
+        jacobian = np.stack([(residual(x + h[:, j:j + 1] * eye[j]) - r) / h[:, j:j + 1] for j in range(3)], axis=-1)
+        jtj = jacobian.transpose(0, 2, 1) @ jacobian
+        grad = (jacobian.transpose(0, 2, 1) @ r[..., None])[..., 0]
+        a = jtj + damping[:, None, None] * (np.diagonal(jtj, axis1=1, axis2=2)[:, None, :] * eye + 1e-12 * eye)
+        trial = x - np.linalg.solve(a, grad[..., None])[..., 0]
+        r_trial = residual(trial)
+        cost_trial = (r_trial * r_trial).sum(axis=1)
+        better = np.isfinite(cost_trial) & (cost_trial < cost)
+        x = np.where(better[:, None], trial, x)
+        r = np.where(better[:, None], r_trial, r)
+        cost = np.where(better, cost_trial, cost)
+        damping = np.where(better, damping / 3, damping * 4)
+
+    cfg = _config(base, top, k, x)
+    found = steps(cfg, metric, hue)
+    out = []
+    for i in range(len(top)):
+        one = Config(**{f.name: float(np.broadcast_to(getattr(cfg, f.name), (len(top), 1))[i, 0])
+                        for f in fields(Config)})
+        if not np.isnan(hue[i]):
+            one = replace(one, hue=float(hue[i]))
+        out.append(Solution(one, float(hue[i]), target[i], found[i], surface_l(one, DEPTHS)))
+    return out
+
+
+def table(solutions: list[Solution], metric: str = "wcag", max_error: float = MAX_ERROR) -> str:
+    fmt = "{:.3f}" if metric == "wcag" else "{:.2f}"
+    lines = [f"{'hue':>5} {'top-l':>6} {'base-step':>9} {'curve-k':>7} {'surf-mid':>8} {'surf-rng':>8}  "
+             f"{'steps (' + metric + ')':32} {'error':>6}  surf-l"]
+    for s in solutions:
+        c = s.config
+        hue = "-" if np.isnan(s.hue) else f"{s.hue:g}"
+        flag = "".join(f"  {p}" for p in s.problems(max_error))
+        lines.append(f"{hue:>5} {c.top_l:>6g} {c.base_step:>9.4f} {c.curve_k:>7g} {c.surf_mid:>8.3f} "
+                     f"{c.surf_rng:>8.3f}  {' '.join(fmt.format(v) for v in s.steps):32} {s.error:>6.1%}  "
+                     f"{' '.join(f'{v:.1f}' for v in s.surf_l)}{flag}")
+    return "\n".join(lines)
@@ -0,0 +1,125 @@
+"""The README's layer-placement rules, as pluggable checks.
+
+A rule is a function registered with ``@rule(code, severity, *kinds)``; it
+receives every node of one of ``kinds`` together with the node's layer and
+a ``Context`` (the lint ``Index`` plus facts derived from it once per run)
+and yields a message per violation. ``check`` walks the tree once and hands
+each node to every rule registered for its type, so adding a rule adds a
+function call per matching node, not another traversal.
+
+Built-in rules:
+
+- ``reset-reads-core``: ``reset.*`` must not read core tokens (``--_bg``,
+  ``--s``, ``--type``, anything declared in ``core.*``). Such a rule is
+  ``theme`` or ``component.base``.
+- ``important-outside-utility``: ``!important`` only in ``utility.important``.
+- ``private-token``: core's ``--_*`` tokens and ``--depth`` are assigned
+  by ``core.*`` only. A component's own ``--_*`` internals are fine.
+- ``domain-noun``: ``component.*`` classes must be generic; a class named
+  after a domain noun is app code and belongs in a ``me {}`` block.
+"""
+
+import re
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+from . import lexer
+from .lexer import tokenize
+from .lint import ERROR, SEVERITIES, WARNING, Index, Issue
+from .parse import Decl, Node, Rule, layer_of, walk
+
+CORE_TOKENS = frozenset({"--_bg", "--s", "--type", "--space", "--depth"})
+DOMAIN_NOUNS = frozenset({
+    "timeline", "xp", "aside", "invoice", "sidebar", "header", "resume", "role",
+    "profile", "account", "user", "cart", "checkout", "order", "product", "customer",
+})
+
+_VAR = re.compile(r"var\(\s*(--[\w-]+)")
+_WORD = re.compile(r"[-_]+")
+
+
+@dataclass
+class Context:
+    index: Index
+    core_tokens: frozenset[str]
+    domain_nouns: frozenset[str] = DOMAIN_NOUNS
+
+
+@dataclass(frozen=True)
+class Check:
+    code: str
+    severity: str
+    kinds: tuple[type, ...]
+    fn: Callable[[Node, str | None, Context], Iterable[str]]
+
+
+RULES: dict[str, Check] = {}
+
+
+def rule(code: str, severity: str, *kinds: type):
+    """Register the decorated function as a rule over nodes of ``kinds``."""
+    def register(fn):
+        RULES[code] = Check(code, severity, kinds, fn)
+        return fn
+    return register
+
+
+def core_tokens(idx: Index) -> frozenset[str]:
+    declared = {n for n, sites in idx.declarations.items()
+                if any(s.layer and s.layer.startswith("core.") for s in sites)}
+    return CORE_TOKENS | declared
+
+
+def _classes(selector: str) -> list[str]:
+    tokens = list(tokenize(selector))
+    return [tokens[i + 1].text for i, t in enumerate(tokens[:-1])
+            if t.kind == lexer.DELIM and t.text == "." and tokens[i + 1].kind == lexer.IDENT]
+
+
+@rule("reset-reads-core", ERROR, Decl)
+def _reset_reads_core(node: Decl, layer: str | None, ctx: Context) -> Iterable[str]:
+    if layer and layer.startswith("reset."):
+        for name in _VAR.findall(node.value):
+            if name in ctx.core_tokens:
+                yield f"{layer} reads core token {name}; move the rule to theme or component.base"
+
+
+@rule("important-outside-utility", ERROR, Decl)
+def _important(node: Decl, layer: str | None, ctx: Context) -> Iterable[str]:
+    if node.important and layer != "utility.important":
+        yield f"{node.name}: !important in {layer or 'unlayered css'}; only utility.important may use it"
+
+
+@rule("private-token", ERROR, Decl)
+def _private(node: Decl, layer: str | None, ctx: Context) -> Iterable[str]:
+    private = node.name.startswith("--_") and node.name in ctx.core_tokens
+    if (private or node.name == "--depth") and not (layer or "").startswith("core."):
+        yield f"{node.name} is private to core.*; set the public inputs instead"
+
+
+@rule("domain-noun", WARNING, Rule)
+def _domain_noun(node: Rule, layer: str | None, ctx: Context) -> Iterable[str]:
+    if layer and layer.startswith("component."):
+        for cls in _classes(node.prelude):
+            if ctx.domain_nouns.intersection(_WORD.split(cls.lower())):
+                yield f".{cls} in {layer} is named after a domain noun; write it as a me {{}} block in the app"
+
+
+def check(nodes: Iterable[Node], idx: Index, codes: Iterable[str] | None = None,
+          domain_nouns: Iterable[str] = ()) -> list[Issue]:
+    """Run the registered rules (or only ``codes``) over ``nodes`` in one traversal."""
+    selected = [RULES[c] for c in codes] if codes is not None else list(RULES.values())
+    by_kind: dict[type, list[Check]] = {}
+    for c in selected:
+        for kind in c.kinds:
+            by_kind.setdefault(kind, []).append(c)
+    ctx = Context(idx, core_tokens(idx), DOMAIN_NOUNS | frozenset(domain_nouns))
+    issues = []
+    for node, ancestors in walk(nodes):
+        checks = by_kind.get(type(node))
+        if not checks:
+            continue
+        layer = layer_of(ancestors)
+        for c in checks:
+            issues.extend(Issue(c.severity, c.code, msg, node.line) for msg in c.fn(node, layer, ctx))
+    return sorted(issues, key=lambda i: (SEVERITIES.index(i.severity), i.line))
@@ -0,0 +1,134 @@
+"""Split a bundle into a render-blocking file and media-gated chunks.
+
+- ``print``: the contents of every ``@media print`` block, wrapped in the
+  layers (and nesting) they came from. Linked with ``media="print"`` the
+  browser still downloads it but never blocks rendering on it.
+- ``highlight``: every ``::highlight(...)`` rule. Only pages with a
+  ``<pre>`` need the syntax colours.
+- ``main``: everything else — ``@property`` registrations, ``reset.*``,
+  ``core.*`` and the rest of the layers, in their original order.
+
+Every chunk opens with the same ``@layer`` order statement (by default the
+bundle's own; pass ``order`` to reuse e.g. ``static/_order.css``), so a
+chunk that loads late still slots its rules into the right cascade layer.
+A given ``order`` that misses layers the bundle uses would let those be
+created implicitly, after everything it lists; ``merge_order`` adds them
+at their position in the bundle instead.
+"""
+
+from pathlib import Path
+
+from .parse import AtRule, Decl, Node, Rule, layer_names, layer_of, parse, walk
+
+CHUNKS = ("main", "print", "highlight")
+
+
+def _is_print(node: Node) -> bool:
+    return isinstance(node, AtRule) and node.name == "media" and node.prelude.strip().lower() == "print"
+
+
+def _is_highlight(node: Node) -> bool:
+    return isinstance(node, Rule) and "::highlight(" in node.prelude
+
+
+def _shell(node: Rule | AtRule, children: list[Node]) -> Rule | AtRule:
+    if isinstance(node, Rule):
+        return Rule(node.prelude, children, node.line)
+    return AtRule(node.name, node.prelude, children, node.line)
+
+
+def _partition(children: list[Node]) -> dict[str, list[Node]]:
+    parts: dict[str, list[Node]] = {name: [] for name in CHUNKS}
+    for node in children:
+        if _is_print(node):
+            parts["print"].extend(node.children)
+        elif _is_highlight(node):
+            parts["highlight"].append(node)
+        elif isinstance(node, Decl) or node.children is None:
+            parts["main"].append(node)
+        else:
+            inner = _partition(node.children)
+            for name, nodes in inner.items():
+                if nodes or (name == "main" and not _droppable(node)):
+                    parts[name].append(_shell(node, nodes))
+    return parts
+
+
+def _droppable(node: Node) -> bool:
+    # An emptied @layer block still has to stay: it may be what declares the layer.
+    return not (isinstance(node, AtRule) and node.name == "layer")
+
+
+def order_statement(path: str | Path) -> AtRule | None:
+    """The first top-level ``@layer a, b, …;`` statement of the stylesheet at ``path``."""
+    for node in parse(Path(path).read_text(encoding="utf-8")):
+        if isinstance(node, AtRule) and node.name == "layer" and node.children is None:
+            return node
+    return None
+
+
+def bundle_layers(nodes: list[Node]) -> list[str]:
+    """Dotted names of every layer ``nodes`` declare, in first-mention order."""
+    found: dict[str, None] = {}
+    for node, ancestors in walk(nodes):
+        if isinstance(node, AtRule) and node.name == "layer":
+            prefix = layer_of(ancestors)
+            for name in layer_names(node):
+                found[f"{prefix}.{name}" if prefix else name] = None
+    return list(found)
+
+
+def merge_order(order: AtRule, nodes: list[Node]) -> tuple[AtRule, list[str]]:
+    """``order`` with the layers ``nodes`` use but it does not list, each after the layer
+    that precedes it in the bundle; and the names that were added."""
+    names = layer_names(order)
+    listed = set(names) | {n.rsplit(".", 1)[0] for n in names if "." in n}
+    added = []
+    previous = None
+    for name in bundle_layers(nodes):
+        if name not in listed:
+            names.insert(names.index(previous) + 1 if previous in names else 0, name)
+            listed.add(name)
+            added.append(name)
+        previous = name
+    if not added:
+        return order, []
+    return AtRule("layer", ", ".join(names), None, order.line), added
+
+
+def split(css: str, order: AtRule | None = None) -> dict[str, list[Node]]:
+    """Chunk name → nodes. Empty chunks are omitted. A given ``order`` is completed
+    with ``merge_order``."""
+    nodes = list(parse(css))
+    statement = merge_order(order, nodes)[0] if order else next(
+        (n for n in nodes if isinstance(n, AtRule) and n.name == "layer" and n.children is None), None)
+    parts = _partition(nodes)
+    out = {}
+    for name in CHUNKS:
+        chunk = parts[name]
+        if name != "main" and not chunk:
+            continue
+        if statement is not None and statement not in chunk:
+            chunk = [statement, *chunk]
+        out[name] = chunk
+    return out
+
+
+def chunk_path(base: str | Path, name: str) -> Path:
+    base = Path(base)
+    return base if name == "main" else base.with_name(f"{base.stem}.{name}{base.suffix}")
+
+
+def link_tags(base: str, chunks: list[str], html: str | None = None) -> str:
+    """``<link>`` tags for the chunks; with ``html``, skip the highlight chunk unless it has a ``<pre>``."""
+    tags = []
+    for name in chunks:
+        href = chunk_path(base, name).as_posix()
+        if name == "print":
+            tags.append(f'<link rel="stylesheet" href="{href}" media="print">')
+        elif name == "highlight":
+            if html is None or "<pre" in html.lower():
+                tags.append(f'<link rel="stylesheet" href="{href}">')
+        else:
+            tags.append(f'<link rel="stylesheet" href="{href}">')
+    return "\n".join(tags)
@@ -0,0 +1,212 @@
+"""Find style rules outside every ``@layer`` and move them into their layer.
+
+Unlayered rules beat every layer, whatever the order statement says. Only
+``@property``, ``@font-face``, ``@import`` (plus ``@charset``,
+``@namespace`` and the ``@layer`` order statement) may live outside one.
+
+``find`` reports every other top-level statement with its exact line span
+in the notebook and the layer it belongs in: the layer the rest of its cell
+is written in; for a cell with no layer block at all, like core.space, the
+layer its markdown heading names, else the one declared-but-unwritten
+layer between its neighbours' layers.
+
+``sarif`` renders the findings as SARIF 2.1.0 (one result per rule, with
+the cell in ``logicalLocations`` and the fix attached); ``fix`` applies the
+fixes to the notebook source by wrapping each run of unlayered rules in
+``@layer <owner> { … }`` where it stands, so source order is unchanged.
+"""
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from . import lexer
+from .cache import VERSION
+from .extract import Cell, bundle, cells
+from .incremental import session_ids
+from .lexer import tokenize
+from .lint import index
+
+ALLOWED = frozenset({"property", "font-face", "import", "charset", "namespace"})
+RULE_ID = "unlayered-rule"
+INDENT = "    "
+
+_HEADING = re.compile(r"^\s*#+\s+([\w.-]+)\s*$", re.M)
+
+
+@dataclass(frozen=True, slots=True)
+class Finding:
+    cell: int
+    cell_id: str
+    start: int  # 1-based notebook lines, inclusive
+    end: int
+    prelude: str
+    layer: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class _Span:
+    start: int
+    end: int
+    at: str | None
+    prelude: str
+    block: bool
+
+
+def _spans(text: str, first_line: int) -> list[_Span]:
+    """Top-level statements of ``text`` with their line spans, offset to ``first_line``."""
+    out = []
+    depth = 0
+    head: list[lexer.Token] = []
+    start = None
+    for tok in tokenize(text):
+        if tok.kind == lexer.COMMENT or (tok.kind == lexer.WS and start is None):
+            continue
+        if start is None:
+            start = tok.line
+        if tok.kind == lexer.LBRACE:
+            depth += 1
+        elif tok.kind == lexer.RBRACE:
+            depth -= 1
+        elif depth == 0 and tok.kind != lexer.SEMICOLON:
+            head.append(tok)
+        if depth == 0 and tok.kind in (lexer.SEMICOLON, lexer.RBRACE):
+            sig = [t for t in head if t.kind != lexer.WS]
+            at = sig[0].text[1:].lower() if sig and sig[0].kind == lexer.AT else None
+            prelude = " ".join("".join(t.text for t in (head[1:] if at else head)).split())
+            out.append(_Span(start + first_line - 1, tok.line + first_line - 1, at, prelude,
+                             tok.kind == lexer.RBRACE))
+            head, start = [], None
+        if depth < 0:
+            depth = 0
+    return out
+
+
+def _cell_layers(cell: Cell) -> list[str]:
+    return [s.prelude for b in cell.blocks for s in _spans(b.text, b.line)
+            if s.at == "layer" and s.block]
+
+
+def _owner(i: int, cell_list: list[Cell], layers: list[list[str]], order: list[str]) -> str | None:
+    if layers[i]:
+        return layers[i][0]
+    for heading in _HEADING.findall(cell_list[i].code):
+        if heading in order:
+            return heading
+    written = {name for names in layers for name in names}
+    before = next((names[-1] for names in reversed(layers[:i]) if names), None)
+    after = next((names[0] for names in layers[i + 1:] if names), None)
+    lo = order.index(before) + 1 if before in order else 0
+    hi = order.index(after) if after in order else len(order)
+    candidates = [name for name in order[lo:hi] if name not in written]
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def find(notebook: str | Path) -> list[Finding]:
+    """Every unlayered style rule or at-rule block in ``notebook``'s css fences."""
+    cell_list = [c for c in cells(Path(notebook).read_text(encoding="utf-8")) if c.blocks]
+    order = index(bundle(cell_list)).order
+    ids = session_ids(notebook)
+    layers = [_cell_layers(c) for c in cell_list]
+    out = []
+    for i, cell in enumerate(cell_list):
+        cell_id = ids[cell.index] if cell.index < len(ids) else f"cell {cell.index}"
+        for block in cell.blocks:
+            for span in _spans(block.text, block.line):
+                if span.at in ALLOWED or span.at == "layer":
+                    continue
+                prelude = f"@{span.at} {span.prelude}".strip() if span.at else span.prelude
+                out.append(Finding(cell.index, cell_id, span.start, span.end, prelude,
+                                   _owner(i, cell_list, layers, order)))
+    return out
+
+
+def _message(f: Finding) -> str:
+    where = f"it belongs in @layer {f.layer}" if f.layer else "its owning layer is unknown"
+    return f"{f.prelude} is outside every layer and beats the whole cascade; {where}"
+
+
+def _runs(findings: list[Finding], lines: list[str]) -> list[list[Finding]]:
+    """Group findings that sit next to each other (blank lines between) under one layer."""
+    runs: list[list[Finding]] = []
+    for f in sorted(findings, key=lambda f: f.start):
+        if f.layer is None:
+            continue
+        prev = runs[-1][-1] if runs else None
+        if (prev and prev.layer == f.layer and prev.cell == f.cell
+                and all(not l.strip() for l in lines[prev.end:f.start - 1])):
+            runs[-1].append(f)
+        else:
+            runs.append([f])
+    return runs
+
+
+def _wrapped(run: list[Finding], lines: list[str]) -> list[str]:
+    body = lines[run[0].start - 1:run[-1].end]
+    first = body[0]
+    pad = first[:len(first) - len(first.lstrip())]
+    inner = [INDENT + l if l.strip() else l for l in body]
+    return [f"{pad}@layer {run[0].layer} {{\n", *inner, f"{pad}}}\n"]
+
+
+def fix(source: str, findings: list[Finding]) -> str:
+    """``source`` with every finding that has an owning layer wrapped in that layer."""
+    lines = source.splitlines(keepends=True)
+    for run in reversed(_runs(findings, lines)):
+        lines[run[0].start - 1:run[-1].end] = _wrapped(run, lines)
+    return "".join(lines)
+
+
+def sarif(notebook: str | Path, findings: list[Finding]) -> dict:
+    uri = Path(notebook).as_posix()
+    lines = Path(notebook).read_text(encoding="utf-8").splitlines(keepends=True)
+    fixes = {id(f): run for run in _runs(findings, lines) for f in run}
+    results = []
+    for f in findings:
+        result = {
+            "ruleId": RULE_ID,
+            "level": "error",
+            "message": {"text": _message(f)},
+            "locations": [{
+                "physicalLocation": {"artifactLocation": {"uri": uri},
+                                     "region": {"startLine": f.start, "endLine": f.end}},
+                "logicalLocations": [{"name": f.cell_id, "kind": "function",
+                                      "fullyQualifiedName": f"{uri}::{f.cell_id}"}],
+            }],
+        }
+        run = fixes.get(id(f))
+        if run and run[0] is f:
+            result["fixes"] = [{
+                "description": {"text": f"wrap in @layer {f.layer}"},
+                "artifactChanges": [{
+                    "artifactLocation": {"uri": uri},
+                    "replacements": [{
+                        "deletedRegion": {"startLine": f.start, "startColumn": 1,
+                                          "endLine": run[-1].end + 1, "endColumn": 1},
+                        "insertedContent": {"text": "".join(_wrapped(run, lines))},
+                    }],
+                }],
+            }]
+        results.append(result)
+    return {
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "version": "2.1.0",
+        "runs": [{
+            "tool": {"driver": {
+                "name": "toolbox-css",
+                "version": VERSION,
+                "rules": [{
+                    "id": RULE_ID,
+                    "shortDescription": {"text": "Style rule outside every @layer"},
+                    "fullDescription": {"text": "Only @property, @font-face and @import may be "
+                                                "unlayered; unlayered rules beat every layer."},
+                    "defaultConfiguration": {"level": "error"},
+                }],
+            }},
+            "results": results,
+        }],
+    }
+
+
+def report(notebook: str | Path, findings: list[Finding]) -> str:
+    return "\n".join(f"{notebook}:{f.start}-{f.end} [{f.cell_id}] {_message(f)}" for f in findings)
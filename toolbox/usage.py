@@ -0,0 +1,94 @@
+"""Which classes, ids and attributes a set of HTML pages actually uses.
+
+Markup is read with ``html.parser``; inline scripts are also searched for
+``classList.add/toggle/replace("…")`` calls, since the pointer-events helper
+and most page scripts add classes at runtime.
+"""
+
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from pathlib import Path
+
+TEMPLATE_SUFFIXES = (".html", ".htm", ".jinja", ".jinja2", ".j2")
+
+_CLASSLIST = re.compile(r"classList\.(?:add|toggle|replace)\(([^)]*)\)")
+_STRING = re.compile(r"""["']([^"']+)["']""")
+
+
+@dataclass
+class Usage:
+    tags: set[str] = field(default_factory=set)
+    classes: set[str] = field(default_factory=set)
+    ids: set[str] = field(default_factory=set)
+    attrs: dict[str, set[str]] = field(default_factory=dict)
+
+    def update(self, other: "Usage") -> None:
+        self.tags |= other.tags
+        self.classes |= other.classes
+        self.ids |= other.ids
+        for name, values in other.attrs.items():
+            self.attrs.setdefault(name, set()).update(values)
+
+    def has_attr(self, name: str, value: str | None = None) -> bool:
+        values = self.attrs.get(name)
+        return values is not None and (value is None or value in values)
+
+
+class _Scanner(HTMLParser):
+    def __init__(self, usage: Usage):
+        super().__init__(convert_charrefs=True)
+        self.usage = usage
+        self._script = False
+
+    def handle_starttag(self, tag, attrs):
+        u = self.usage
+        u.tags.add(tag)
+        self._script = tag == "script"
+        for name, value in attrs:
+            value = value or ""
+            u.attrs.setdefault(name, set()).add(value)
+            if name == "class":
+                u.classes.update(value.split())
+            elif name == "id":
+                u.ids.add(value)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        self._script = False
+
+    def handle_endtag(self, tag):
+        self._script = False
+
+    def handle_data(self, data):
+        if self._script:
+            for call in _CLASSLIST.findall(data):
+                for s in _STRING.findall(call):
+                    self.usage.classes.update(s.split())
+
+
+def scan_html(text: str, usage: Usage | None = None) -> Usage:
+    usage = Usage() if usage is None else usage
+    scanner = _Scanner(usage)
+    scanner.feed(text)
+    scanner.close()
+    return usage
+
+
+def template_files(paths: list[str | Path]) -> list[Path]:
+    """Expand directories into the template files under them."""
+    out = []
+    for p in map(Path, paths):
+        if p.is_dir():
+            out.extend(sorted(f for f in p.rglob("*") if f.suffix in TEMPLATE_SUFFIXES))
+        else:
+            out.append(p)
+    return out
+
+
+def scan(paths: list[str | Path]) -> Usage:
+    """Usage across every template in ``paths`` (files or directories)."""
+    usage = Usage()
+    for path in template_files(paths):
+        scan_html(path.read_text(encoding="utf-8"), usage)
+    return usage
@@ -0,0 +1,228 @@
+"""Watch mode: rebuild on save, serve the tree, hot-swap CSS in open pages.
+
+Saves are picked up with inotify on Linux (through ``ctypes``, no extra
+dependency) and by polling mtimes elsewhere, then debounced so an editor's
+write-rename-chmod burst is one rebuild. Rebuilds go through
+``incremental.rebuild``, so only the edited cells are re-minified, and the
+output's precompressed siblings are refreshed at the same time.
+
+The dev server is a ``ThreadingHTTPServer`` over the repo root. It serves the
+``.br``/``.zst``/``.gz`` variant of a file when the client accepts it and
+the variant is fresh, injects a small script into HTML pages, and pushes a
+server-sent event on every rebuild; the script swaps the matching
+``<link>`` for a cache-busted copy and drops the old one once the new one
+has loaded, so the page restyles without reloading.
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from pathlib import Path
+
+from .assets import codecs
+from .incremental import rebuild
+from .minify import minify
+
+DEBOUNCE = 0.08
+ENCODINGS = (("br", "br"), ("zstd", "zst"), ("gzip", "gz"))
+
+LIVE_JS = b"""\
+new EventSource("/__events").onmessage = (e) => {
+  const { href } = JSON.parse(e.data);
+  for (const link of document.querySelectorAll('link[rel="stylesheet"]')) {
+    const url = new URL(link.href);
+    if (url.pathname.split("/").pop() !== href) continue;
+    url.searchParams.set("v", Date.now());
+    const next = link.cloneNode();
+    next.href = url;
+    next.onload = () => link.remove();
+    link.after(next);
+  }
+};
+"""
+
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_EVENT = struct.Struct("iIII")
+
+
+class Events:
+    """Broadcast the latest rebuild to every waiting client."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._data = None
+
+    def publish(self, data: dict) -> None:
+        with self._cond:
+            self._seq += 1
+            self._data = data
+            self._cond.notify_all()
+
+    def wait(self, seq: int, timeout: float) -> tuple[int, dict | None]:
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != seq, timeout)
+            return self._seq, self._data if self._seq != seq else None
+
+
+def _inotify_changes(paths: list[Path]) -> Iterator[set[Path]] | None:
+    lib = ctypes.util.find_library("c")
+    if sys.platform != "linux" or lib is None:
+        return None
+    libc = ctypes.CDLL(lib, use_errno=True)
+    fd = libc.inotify_init1(os.O_CLOEXEC)
+    if fd < 0:
+        return None
+    # Watch directories: editors often save by writing a temp file and renaming it.
+    dirs: dict[int, Path] = {}
+    for d in {p.parent.resolve() for p in paths}:
+        wd = libc.inotify_add_watch(fd, os.fsencode(d),
+                                    _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE)
+        if wd >= 0:
+            dirs[wd] = d
+    wanted = {p.resolve() for p in paths}
+
+    def events():
+        pending: set[Path] = set()
+        while True:
+            ready, _, _ = select.select([fd], [], [], DEBOUNCE if pending else None)
+            if not ready:
+                yield pending
+                pending = set()
+                continue
+            buf = os.read(fd, 64 * 1024)
+            pos = 0
+            while pos < len(buf):
+                wd, _mask, _cookie, size = _EVENT.unpack_from(buf, pos)
+                name = buf[pos + _EVENT.size:pos + _EVENT.size + size].rstrip(b"\0")
+                pos += _EVENT.size + size
+                path = dirs.get(wd, Path()) / os.fsdecode(name)
+                if path in wanted:
+                    pending.add(path)
+
+    return events()
+
+
+def _polling_changes(paths: list[Path], interval: float = 0.2) -> Iterator[set[Path]]:
+    def mtimes():
+        return {p.resolve(): p.stat().st_mtime_ns for p in paths if p.exists()}
+
+    seen = mtimes()
+    while True:
+        time.sleep(interval)
+        now = mtimes()
+        changed = {p for p, m in now.items() if seen.get(p) != m}
+        if changed:
+            time.sleep(DEBOUNCE)
+            now = mtimes()
+            yield changed
+        seen = now
+
+
+def changes(paths: list[str | Path]) -> Iterator[set[Path]]:
+    """Yield the set of ``paths`` changed by each debounced burst of saves."""
+    paths = [Path(p) for p in paths]
+    return _inotify_changes(paths) or _polling_changes(paths)
+
+
+def precompress(path: Path) -> None:
+    data = path.read_bytes()
+    for suffix, compress in codecs().items():
+        path.with_name(f"{path.name}.{suffix}").write_bytes(compress(data))
+
+
+class Handler(SimpleHTTPRequestHandler):
+    events: Events
+
+    def do_GET(self):
+        if self.path == "/__events":
+            return self._stream()
+        if self.path == "/__live.js":
+            return self.copyfile(self._head(LIVE_JS, "text/javascript"), self.wfile)
+        return super().do_GET()
+
+    def end_headers(self):
+        self.send_header("Cache-Control", "no-cache")
+        super().end_headers()
+
+    def _stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        seq = self.events.wait(-1, 0)[0]
+        try:
+            while True:
+                seq, data = self.events.wait(seq, 15)
+                msg = f"data: {json.dumps(data)}\n\n" if data else ": keepalive\n\n"
+                self.wfile.write(msg.encode())
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def send_head(self):
+        path = Path(self.translate_path(self.path))
+        if not path.is_file():
+            return super().send_head()
+        ctype = self.guess_type(str(path))
+        if path.suffix in (".html", ".htm"):
+            html = path.read_bytes().replace(
+                b"</body>", b'<script src="/__live.js"></script></body>', 1)
+            return self._head(html, ctype)
+        accepted = self.headers.get("Accept-Encoding", "")
+        mtime = path.stat().st_mtime
+        for encoding, suffix in ENCODINGS:
+            variant = path.with_name(f"{path.name}.{suffix}")
+            if encoding in accepted and variant.is_file() and variant.stat().st_mtime >= mtime:
+                return self._head(variant.read_bytes(), ctype, encoding)
+        return super().send_head()
+
+    def _head(self, body: bytes, ctype: str, encoding: str | None = None):
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+            self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        return BytesIO(body)
+
+
+def serve(directory: str | Path, host: str, port: int, events: Events) -> ThreadingHTTPServer:
+    handler = type("LiveHandler", (Handler,), {"events": events})
+    server = ThreadingHTTPServer((host, port), partial(handler, directory=str(directory)))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def watch(notebook: str | Path, output: str | Path, directory: str | Path = ".",
+          host: str = "127.0.0.1", port: int = 8000) -> None:
+    """Serve ``directory`` and rebuild ``output`` from ``notebook`` on every save, forever."""
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    events = Events()
+    build = partial(rebuild, notebook, output, stage="minify", transform=minify)
+    print(build(), file=sys.stderr)
+    precompress(output)
+    serve(directory, host, port, events)
+    print(f"serving {directory}/ on http://{host}:{port}/ — watching {notebook}", file=sys.stderr)
+    for _ in changes([notebook]):
+        start = time.perf_counter()
+        result = build()
+        if result.written:
+            precompress(output)
+            events.publish({"href": output.name})
+        print(f"{result}  {(time.perf_counter() - start) * 1000:.0f} ms", file=sys.stderr)